@@ -5,16 +5,20 @@ from flask_login import LoginManager
 from flask_migrate import Migrate
 
 from app.models import db
-from app.models.books import Book
 from app.models.user import User
+from app.models.book_facet import BookFacet  # noqa: F401 (register table, hooks)
+from app.models.revoked_token import RevokedToken  # noqa: F401 (register table)
 from app.schemas import api
 from app.utils.auth_utils import init_jwt
+from app.utils.response_cache import init_response_cache
 from app.routes import register_routes
+from app.commands import register_commands
 from app.config.database import (
     SQLALCHEMY_DATABASE_URI,
     SECRET_KEY,
     SQLALCHEMY_TRACK_MODIFICATIONS,
 )
+from app.config.uploads import MAX_CONTENT_LENGTH, USE_X_SENDFILE
 
 # Correct the logging level
 logging.basicConfig(level=logging.INFO)
@@ -31,15 +35,21 @@ def create_app() -> Flask:
     app.config["SQLALCHEMY_DATABASE_URI"] = SQLALCHEMY_DATABASE_URI
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = SQLALCHEMY_TRACK_MODIFICATIONS
     app.config["SECRET_KEY"] = SECRET_KEY
+    app.config["USE_X_SENDFILE"] = USE_X_SENDFILE
+    app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 
     db.init_app(app)
 
     init_jwt(app)
 
+    init_response_cache(app)
+
     Migrate(app, db)
 
     register_routes(api, app)
 
+    register_commands(app)
+
     api.init_app(app)
 
     login_manager.init_app(app)
@@ -48,7 +58,4 @@ def create_app() -> Flask:
 
     login_manager.user_loader(User.load_user)
 
-    User.create_initial_users(app)
-    Book.creat_inital_books(app)
-
     return app
@@ -0,0 +1,387 @@
+from datetime import datetime
+import json
+import os
+import random
+import time
+from typing import Callable, Optional
+
+import click
+from flask import Flask
+from flask.cli import AppGroup, with_appcontext
+from flask_migrate import stamp
+from sqlalchemy import inspect
+
+from app.config.auth import PASSWORD_HASH_METHOD
+from app.models import db
+from app.models.book_facet import BookFacet
+from app.models.books import BOOK_FIELDS, Book
+from app.models.user import USER_FIELDS, User, UserRole
+from app.schemas import dumps, orjson
+from app.utils.autocomplete import build_index
+from app.utils.fieldsets import FieldSpec, compile_serializer
+from app.utils.passwords import benchmark_policy, policy_prefix
+from app.utils.query_plans import HOT_QUERIES, explain, plan_regressions
+from app.utils.renditions import generate_renditions, rendition_executor
+from app.utils.seed_bundle import fetch_seed_covers, load_seed_bundle
+
+books_cli = AppGroup("books", help="Catalog maintenance.")
+covers_cli = AppGroup("covers", help="Cover store maintenance.")
+users_cli = AppGroup("users", help="User provisioning.")
+api_cli = AppGroup("api", help="API diagnostics.")
+queries_cli = AppGroup("queries", help="Query plan checks.")
+
+
+@books_cli.command("rebuild-facets")
+def rebuild_facets() -> None:
+    """Recount the facet counters from the books table."""
+    rows = BookFacet.rebuild()
+    db.session.commit()
+    click.echo(f"{rows} facet values rebuilt")
+
+
+def _peak_rss_kib() -> Optional[int]:
+    # resource is Unix-only; the rest of the benchmark runs anywhere
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@books_cli.command("benchmark-autocomplete")
+@click.option(
+    "--titles", default=200000, show_default=True, help="Synthetic books to index."
+)
+@click.option("--queries", default=2000, show_default=True, help="Lookups to time.")
+def benchmark_autocomplete(titles: int, queries: int) -> None:
+    """Measure autocomplete index build time, memory and lookup latency."""
+    rng = random.Random(42)
+    # Enough distinct syllables that trigram posting lists look like real titles
+    syllables = [
+        onset + vowel + coda
+        for onset in (
+            "",
+            "b",
+            "d",
+            "f",
+            "g",
+            "h",
+            "k",
+            "l",
+            "m",
+            "n",
+            "p",
+            "r",
+            "s",
+            "t",
+            "v",
+            "w",
+        )
+        for vowel in "aeiou"
+        for coda in ("", "n", "r", "s", "l")
+    ]
+
+    def word() -> str:
+        return "".join(
+            rng.choice(syllables) for _ in range(rng.randint(1, 4))
+        ).capitalize()
+
+    authors = [f"{word()} {word()}" for _ in range(max(1, titles // 20))]
+    rows = [
+        (" ".join(word() for _ in range(rng.randint(1, 5))), rng.choice(authors))
+        for _ in range(titles)
+    ]
+
+    peak_before = _peak_rss_kib()
+    started = time.perf_counter()
+    index = build_index(rows)
+    build_seconds = time.perf_counter() - started
+    peak_after = _peak_rss_kib()
+
+    def typed(text: str, misspelled: bool) -> str:
+        prefix = text[: rng.randint(min(3, len(text)), min(len(text), 10))]
+        if misspelled and len(prefix) > 4:
+            position = rng.randrange(1, len(prefix))
+            prefix = prefix[:position] + rng.choice("aeiou") + prefix[position + 1 :]
+        return prefix
+
+    peak = (
+        f"+{(peak_after - peak_before) / 1024:.0f} MiB"
+        if peak_after is not None
+        else "n/a"
+    )
+    click.echo(
+        f"{titles} books, {len(index)} terms, built in {build_seconds:.1f}s"
+        f" (peak RSS {peak})"
+    )
+    for label, misspelled in (("prefix", False), ("misspelled", True)):
+        timings = []
+        for _ in range(queries):
+            query = typed(rng.choice(rows)[rng.randint(0, 1)], misspelled)
+            started = time.perf_counter()
+            index.suggest(query, 10)
+            timings.append((time.perf_counter() - started) * 1e6)
+        timings.sort()
+        click.echo(
+            f"{label:>10}: p50 {timings[len(timings) // 2]:.0f} us"
+            f"  p95 {timings[int(len(timings) * 0.95)]:.0f} us"
+            f"  p99 {timings[int(len(timings) * 0.99)]:.0f} us"
+        )
+
+
+@covers_cli.command("renditions")
+@click.option("--force", is_flag=True, help="Re-render sizes that already exist.")
+def regenerate_renditions(force: bool) -> None:
+    """Generate cover renditions for every book in the catalog."""
+    covers = (
+        Book.query.with_entities(Book.image_hash, Book.image_path)
+        .filter(Book.image_path.isnot(None))
+        .distinct()
+        .all()
+    )
+    futures = [
+        rendition_executor.submit(generate_renditions, image_hash, image_path, force)
+        for image_hash, image_path in covers
+    ]
+
+    written = failed = 0
+    for (image_hash, _), future in zip(covers, futures):
+        try:
+            written += future.result()
+        except Exception as e:
+            failed += 1
+            click.echo(f"Failed to render cover {image_hash}: {e}", err=True)
+
+    click.echo(f"{len(covers)} covers, {written} renditions written, {failed} failed")
+
+
+@click.group("seed", cls=AppGroup, invoke_without_command=True)
+@click.pass_context
+@with_appcontext
+def seed_cli(ctx: click.Context) -> None:
+    """
+    Create the missing seed users and books from the local seed bundle.
+
+    An empty database gets the current schema and is stamped at the latest
+    migration, so later `flask db upgrade` runs apply cleanly. An existing
+    database must be migrated with `flask db upgrade` first.
+    """
+    if ctx.invoked_subcommand is not None:
+        return
+
+    bundle = load_seed_bundle()
+    tables = set(inspect(db.engine).get_table_names())
+    if "books" not in tables:
+        db.create_all()
+        stamp()
+    elif "alembic_version" not in tables:
+        raise click.ClickException(
+            "The database predates migrations; run `flask db upgrade` before seeding."
+        )
+    users = User.create_initial_users(bundle["users"])
+    books = Book.creat_inital_books(bundle["books"])
+    click.echo(f"Seed bundle v{bundle['version']}: {users} users, {books} books added")
+
+
+@seed_cli.command("fetch-covers")
+@click.option("--force", is_flag=True, help="Download covers that already exist.")
+def fetch_covers(force: bool) -> None:
+    """Download the bundle's cover files from their source URLs."""
+    downloaded, failed = fetch_seed_covers(load_seed_bundle(), force=force)
+    click.echo(f"{downloaded} covers downloaded, {failed} failed")
+
+
+@users_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+def import_users(path: str) -> None:
+    """
+    Create the users listed in a JSON file, all or nothing.
+
+    The file holds a list of users or {"users": [...]}, in the format of
+    POST /users/import but without its size limit.
+    """
+    with open(path, encoding="utf-8") as users_file:
+        users = json.load(users_file)
+    if isinstance(users, dict):
+        users = users["users"]
+    try:
+        result = User.bulk_create_users(users)
+    except (KeyError, ValueError) as e:
+        raise click.ClickException(f"Invalid user in {path}: {e}")
+    click.echo(f"{result['created']} users created, {result['skipped']} skipped")
+
+
+@users_cli.command("benchmark-import")
+@click.option("--count", default=10000, show_default=True, help="Users to create.")
+@click.option("--workers", type=int, default=None, help="Hashing processes.")
+def benchmark_import(count: int, workers: Optional[int]) -> None:
+    """Measure bulk user import throughput against a throwaway SQLite database."""
+    users = [
+        {
+            "full_name": f"Bench User {i}",
+            "username": f"bench{i}",
+            "email": f"bench{i}@example.com",
+            "password": User.generate_random_password(12),
+            "role": UserRole.USER.value,
+        }
+        for i in range(count)
+    ]
+
+    bench_app = Flask(__name__)
+    bench_app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(bench_app)
+    with bench_app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        result = User.bulk_create_users(users, workers=workers)
+        elapsed = time.perf_counter() - started
+
+    click.echo(
+        f"{result['created']} users in {elapsed:.2f}s "
+        f"({result['created'] / elapsed:.0f} users/s, workers={workers or os.cpu_count()})"
+    )
+
+
+@users_cli.command("benchmark-hash")
+@click.option(
+    "--method",
+    "methods",
+    multiple=True,
+    help="Policy to measure (repeatable); defaults to a few common ones.",
+)
+@click.option("--rounds", default=5, show_default=True, help="Hashes per policy.")
+def benchmark_hash(methods: tuple[str, ...], rounds: int) -> None:
+    """Report password hash/verify latency per hashing policy on this machine."""
+    methods = methods or (
+        PASSWORD_HASH_METHOD,
+        "scrypt:16384:8:1",
+        "pbkdf2:sha256:600000",
+        "pbkdf2:sha256:1000000",
+    )
+    click.echo(f"current policy: {policy_prefix()}")
+    for method in dict.fromkeys(methods):
+        result = benchmark_policy(method, rounds)
+        click.echo(
+            f"{result['method']:<24} hash {result['hash_ms']:8.1f} ms"
+            f"  verify {result['verify_ms']:8.1f} ms"
+        )
+
+
+def _render_timings(
+    rows: list, per_page: int, to_dict: Callable, encode: Callable
+) -> tuple[float, float]:
+    """Microseconds per row and per listing page for one serializer/encoder pair."""
+    started = time.perf_counter()
+    for row in rows:
+        encode(to_dict(row))
+    per_row = (time.perf_counter() - started) / len(rows) * 1e6
+
+    pages = [rows[i : i + per_page] for i in range(0, len(rows), per_page)]
+    started = time.perf_counter()
+    for page in pages:
+        encode(
+            {
+                "success": True,
+                "data": [to_dict(row) for row in page],
+                "total": len(rows),
+            }
+        )
+    per_page_us = (time.perf_counter() - started) / len(pages) * 1e6
+    return per_row, per_page_us
+
+
+@api_cli.command("benchmark-serialize")
+@click.option("--rows", default=20000, show_default=True, help="Rows to render.")
+@click.option(
+    "--per-page", default=10, show_default=True, help="Rows per listing page."
+)
+def benchmark_serialize(rows: int, per_page: int) -> None:
+    """Compare response rendering cost before/after compiled serializers and orjson."""
+    books = [
+        Book(
+            id=i,
+            title=f"Book title {i}",
+            author=f"Author {i % 500}",
+            description="A fairly long catalog description. " * 8,
+            isbn=f"{i:013d}",
+            available=bool(i % 2),
+            borrowed_by=None if i % 2 else i % 100,
+            borrowed_unilt=None if i % 2 else datetime(2025, 1, 1 + i % 28),
+            image_hash=f"{i:064x}",
+        )
+        for i in range(rows)
+    ]
+    users = [
+        User(id=i, full_name=f"User {i}", username=f"user{i}", role=UserRole.USER)
+        for i in range(rows)
+    ]
+
+    def getter_loop(spec: FieldSpec) -> Callable:
+        # Per-field getter calls, what serialize() did before compilation
+        getters = [
+            (name, getter or (lambda row, name=name: getattr(row, name)))
+            for name, (_, getter) in spec.items()
+        ]
+        return lambda row: {name: getter(row) for name, getter in getters}
+
+    def stdlib(data) -> bytes:
+        return (json.dumps(data) + "\n").encode()
+
+    encoder = dumps if orjson is not None else stdlib
+    click.echo(
+        f"{rows} rows, {per_page} per page, encoder: {'orjson' if orjson else 'json'}"
+    )
+    for name, objects, spec in (
+        ("books", books, BOOK_FIELDS),
+        ("users", users, USER_FIELDS),
+    ):
+        before = _render_timings(objects, per_page, getter_loop(spec), stdlib)
+        after = _render_timings(objects, per_page, compile_serializer(spec), encoder)
+        click.echo(
+            f"{name:<6} per row {before[0]:7.2f} -> {after[0]:7.2f} us"
+            f"   per page {before[1]:8.1f} -> {after[1]:8.1f} us"
+            f"   ({before[1] / after[1]:.1f}x)"
+        )
+
+
+@queries_cli.command("explain")
+@click.option(
+    "--database-uri",
+    default="sqlite://",
+    show_default=True,
+    help="Database to EXPLAIN against; the default builds a scratch SQLite schema.",
+)
+@click.pass_context
+def explain_hot_queries(ctx: click.Context, database_uri: str) -> None:
+    """Print the plan of every hot query and fail if one scans or sorts its table."""
+    plan_app = Flask(__name__)
+    plan_app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    db.init_app(plan_app)
+    with plan_app.app_context():
+        if database_uri == "sqlite://":
+            db.create_all()
+        regressions = 0
+        with db.engine.connect() as connection:
+            dialect = connection.dialect.name
+            for query in HOT_QUERIES:
+                plan = explain(connection, query.statement())
+                problems = plan_regressions(dialect, plan, query.table)
+                regressions += bool(problems)
+                click.echo(f"{'REGRESSED' if problems else 'ok':<9} {query.name}")
+                for row in plan:
+                    click.echo(f"          {row}")
+
+    if regressions:
+        click.echo(
+            f"{regressions} hot queries regressed to a full scan or sort", err=True
+        )
+        ctx.exit(1)
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(api_cli)
+    app.cli.add_command(books_cli)
+    app.cli.add_command(covers_cli)
+    app.cli.add_command(queries_cli)
+    app.cli.add_command(seed_cli)
+    app.cli.add_command(users_cli)
@@ -0,0 +1,51 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Recently verified Basic-auth credentials skip the password KDF
+CREDENTIAL_CACHE_SIZE = int(os.environ.get("CREDENTIAL_CACHE_SIZE", 1024))
+CREDENTIAL_CACHE_TTL = int(os.environ.get("CREDENTIAL_CACHE_TTL", 300))
+# Authorize Bearer tokens from their claims instead of loading the user
+JWT_STATELESS = os.environ.get("JWT_STATELESS", "true").lower() == "true"
+# How long a worker trusts its cached copy of a user's token version
+USER_VERSION_CACHE_TTL = int(os.environ.get("USER_VERSION_CACHE_TTL", 30))
+USER_VERSION_CACHE_SIZE = int(os.environ.get("USER_VERSION_CACHE_SIZE", 4096))
+# Revoked JWTs: each worker polls the revoked_tokens table at most this often
+REVOCATION_SYNC_INTERVAL = float(os.environ.get("REVOCATION_SYNC_INTERVAL", 2))
+# Ids skipped by a sync (inserts still committing) are re-read for this many
+# seconds; at most REVOCATION_GAP_LIMIT of them per sync
+REVOCATION_GAP_TIMEOUT = float(os.environ.get("REVOCATION_GAP_TIMEOUT", 60))
+REVOCATION_GAP_LIMIT = int(os.environ.get("REVOCATION_GAP_LIMIT", 1000))
+REVOCATION_GC_INTERVAL = int(os.environ.get("REVOCATION_GC_INTERVAL", 600))
+REVOCATION_BLOOM_BITS = int(os.environ.get("REVOCATION_BLOOM_BITS", 1 << 20))
+REVOCATION_BLOOM_HASHES = int(os.environ.get("REVOCATION_BLOOM_HASHES", 7))
+# Failed-login token buckets (per username from one client IP, and per
+# client IP), so failures from elsewhere cannot lock a user out
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")  # or "sqlite"
+RATE_LIMIT_SQLITE_PATH = os.environ.get(
+    "RATE_LIMIT_SQLITE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "rate_limit.db"),
+)
+# Buckets that have refilled are deleted this often; the memory backend also
+# keeps at most RATE_LIMIT_MAX_BUCKETS (least recently used dropped first)
+RATE_LIMIT_PRUNE_INTERVAL = float(os.environ.get("RATE_LIMIT_PRUNE_INTERVAL", 60))
+RATE_LIMIT_MAX_BUCKETS = int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", 100000))
+LOGIN_USER_BURST = int(os.environ.get("LOGIN_USER_BURST", 5))
+LOGIN_USER_PER_MINUTE = float(os.environ.get("LOGIN_USER_PER_MINUTE", 5))
+LOGIN_IP_BURST = int(os.environ.get("LOGIN_IP_BURST", 20))
+LOGIN_IP_PER_MINUTE = float(os.environ.get("LOGIN_IP_PER_MINUTE", 20))
+# Werkzeug hash method and cost, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000".
+# Hashes on any other policy are upgraded on the user's next successful login.
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+# Processes in each worker's shared password hashing pool
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+)
+# Users accepted per POST /users/import; hashing runs inside the request, so
+# bigger files go through `flask users import`
+USER_IMPORT_MAX = int(os.environ.get("USER_IMPORT_MAX", 200))
+# API requests authenticate per request and never write the Flask-Login
+# session (no Set-Cookie); set to false for clients relying on the cookie
+SESSIONLESS_API = os.environ.get("SESSIONLESS_API", "true").lower() == "true"
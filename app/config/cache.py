@@ -0,0 +1,20 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where table write generations live: "memory" (this worker only) or
+# "sqlite" (a file shared by every worker on the host)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_SQLITE_PATH = os.environ.get(
+    "CACHE_SQLITE_PATH", os.path.join(os.path.dirname(__file__), "..", "cache.db")
+)
+# Rendered GET responses for the catalog, evicted LRU past these bounds
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.environ.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 4096))
+# Seconds a cached response may be served; bounds staleness when another
+# worker's write bumps a generation this worker cannot see
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 60))
@@ -0,0 +1,13 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Upper bound for per_page in both page-number and cursor mode
+MAX_PER_PAGE = int(os.environ.get("MAX_PER_PAGE", 100))
+
+# Cached totals for count=estimated; writes invalidate them in this worker,
+# the TTL bounds how stale they can get when other workers write
+COUNT_CACHE_SIZE = int(os.environ.get("COUNT_CACHE_SIZE", 1024))
+COUNT_CACHE_TTL = int(os.environ.get("COUNT_CACHE_TTL", 60))
@@ -0,0 +1,21 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Share of the query's trigrams a suggestion must contain (typo tolerance)
+AUTOCOMPLETE_MIN_SIMILARITY = float(os.environ.get("AUTOCOMPLETE_MIN_SIMILARITY", 0.5))
+AUTOCOMPLETE_MAX_LIMIT = int(os.environ.get("AUTOCOMPLETE_MAX_LIMIT", 20))
+# Term ids taken from each posting list per scan step. Lookups stop early once
+# the most used terms give enough full matches, or give enough matches at all
+# after AUTOCOMPLETE_SCAN_BUDGET postings have been read
+AUTOCOMPLETE_SCAN_WINDOW = int(os.environ.get("AUTOCOMPLETE_SCAN_WINDOW", 512))
+AUTOCOMPLETE_SCAN_BUDGET = int(os.environ.get("AUTOCOMPLETE_SCAN_BUDGET", 20000))
+# Rows fetched per round trip while streaming the catalog into the index
+AUTOCOMPLETE_BUILD_BATCH = int(os.environ.get("AUTOCOMPLETE_BUILD_BATCH", 10000))
+# Seconds before a worker rebuilds its index even without a visible write;
+# other workers' writes are invisible to it on the memory cache backend
+AUTOCOMPLETE_MAX_AGE = int(os.environ.get("AUTOCOMPLETE_MAX_AGE", 300))
+# Upper bound for author_limit on the facet counts endpoint
+FACET_AUTHOR_LIMIT_MAX = int(os.environ.get("FACET_AUTHOR_LIMIT_MAX", 100))
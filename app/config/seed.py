@@ -0,0 +1,11 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Versioned seed bundle: bundle.json plus the cover files it references
+SEED_BUNDLE_DIR = os.environ.get(
+    "SEED_BUNDLE_DIR", os.path.join(os.path.dirname(__file__), "..", "seed")
+)
+SEED_DOWNLOAD_WORKERS = int(os.environ.get("SEED_DOWNLOAD_WORKERS", 8))
@@ -8,3 +8,22 @@ ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
 UPLOAD_FOLDER = os.path.join(
     os.path.dirname(__file__), "..", os.environ.get("UPLOAD_FOLDER", "uploads")
 )
+# Content-addressed cover store: covers/<aa>/<bb>/<sha256>.<ext>
+COVERS_FOLDER = os.path.join(UPLOAD_FOLDER, "covers")
+# Largest accepted cover and request body (form fields included), in bytes
+MAX_COVER_SIZE = int(os.environ.get("MAX_COVER_SIZE", 10 * 1024 * 1024))
+MAX_CONTENT_LENGTH = int(
+    os.environ.get("MAX_CONTENT_LENGTH", MAX_COVER_SIZE + 1024 * 1024)
+)
+COVER_CHUNK_SIZE = 64 * 1024
+# Let the front server (nginx X-Accel / Apache X-Sendfile) stream cover files
+USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "false").lower() == "true"
+# Cache lifetime of versioned cover URLs (/books/<id>/image?v=<hash>)
+COVER_MAX_AGE = int(os.environ.get("COVER_MAX_AGE", 60 * 60 * 24 * 365))
+# Cover renditions: name -> bounding box (width, height) in pixels
+RENDITION_SIZES = {
+    "thumb": (160, 240),
+    "card": (320, 480),
+    "full": (1024, 1536),
+}
+RENDITION_WORKERS = int(os.environ.get("RENDITION_WORKERS", 2))
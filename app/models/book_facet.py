@@ -0,0 +1,199 @@
+from collections import Counter
+
+from flask_sqlalchemy.query import Query
+from sqlalchemy import event, func, inspect, literal, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models import db
+from app.models.books import Book
+
+FACET_ATTRIBUTES = ("author", "available", "borrowed_by")
+
+
+class BookFacet(db.Model):
+    """
+    Catalog counts per facet value, kept in step with books by flush hooks.
+
+    facet is "author", "availability" or "borrowed"; rows whose count drops
+    to zero stay until the next rebuild and are filtered out when read.
+    """
+
+    __tablename__ = "book_facets"
+    __table_args__ = (
+        # Most frequent values of a facet first, ties by value
+        db.Index(
+            "ix_book_facets_facet_count",
+            "facet",
+            db.text("count DESC"),
+            "value",
+        ),
+    )
+
+    facet = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(80), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def top_authors(limit: int) -> Query:
+        # Walks ix_book_facets_facet_count and stops after `limit` rows
+        return (
+            db.session.query(BookFacet.value, BookFacet.count)
+            .filter(BookFacet.facet == "author", BookFacet.count > 0)
+            .order_by(BookFacet.count.desc(), BookFacet.value)
+            .limit(limit)
+        )
+
+    @staticmethod
+    def counts(author_limit: int) -> dict:
+        facets = {
+            "author": [
+                {"value": value, "count": count}
+                for value, count in BookFacet.top_authors(author_limit)
+            ],
+            "availability": {},
+            "borrowed": {},
+        }
+        rows = db.session.query(
+            BookFacet.facet, BookFacet.value, BookFacet.count
+        ).filter(BookFacet.facet.in_(("availability", "borrowed")))
+        for facet, value, count in rows:
+            facets[facet][value] = count
+        for facet, values in (
+            ("availability", ("available", "unavailable")),
+            ("borrowed", ("borrowed", "free")),
+        ):
+            for value in values:
+                facets[facet].setdefault(value, 0)
+        return facets
+
+    @staticmethod
+    def rebuild() -> int:
+        """Recount every facet from books with GROUP BY; the caller commits."""
+        db.session.execute(BookFacet.__table__.delete())
+        selects = [
+            select(literal("author"), Book.author, func.count()).group_by(Book.author),
+            select(
+                literal("availability"), _availability_expr(), func.count()
+            ).group_by(_availability_expr()),
+            select(literal("borrowed"), _borrowed_expr(), func.count()).group_by(
+                _borrowed_expr()
+            ),
+        ]
+        inserted = 0
+        for statement in selects:
+            inserted += db.session.execute(
+                BookFacet.__table__.insert().from_select(
+                    ["facet", "value", "count"], statement
+                )
+            ).rowcount
+        return inserted
+
+
+def _availability_expr():
+    return db.case((Book.available.is_(True), "available"), else_="unavailable")
+
+
+def _borrowed_expr():
+    return db.case((Book.borrowed_by.isnot(None), "borrowed"), else_="free")
+
+
+def facet_values(author, available, borrowed_by) -> list[tuple[str, str]]:
+    return [
+        ("author", author),
+        ("availability", "available" if available else "unavailable"),
+        ("borrowed", "borrowed" if borrowed_by is not None else "free"),
+    ]
+
+
+def _previous(book: Book, attribute: str):
+    history = inspect(book).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(book, attribute)
+
+
+# Load the old value when these are set, so the flush can decrement it
+for _attribute in FACET_ATTRIBUTES:
+    event.listen(
+        getattr(Book, _attribute), "set", lambda *args: None, active_history=True
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_facets(session, flush_context, instances) -> None:
+    # The rows are gone by after_flush, so read what they counted towards now
+    for book in session.deleted:
+        if isinstance(book, Book):
+            for name in FACET_ATTRIBUTES:
+                getattr(book, name)
+
+
+def _facet_deltas(session) -> Counter:
+    """
+    Facet count changes of a flush, from the pre-flush new/dirty/deleted sets.
+
+    Runs after the INSERT so column defaults (available=True) are applied.
+    """
+    deltas = Counter()
+    for book in session.new:
+        if isinstance(book, Book):
+            deltas.update(
+                facet_values(*(getattr(book, name) for name in FACET_ATTRIBUTES))
+            )
+    for book in session.deleted:
+        if isinstance(book, Book):
+            deltas.subtract(
+                facet_values(*(_previous(book, name) for name in FACET_ATTRIBUTES))
+            )
+    for book in session.dirty:
+        if isinstance(book, Book) and book not in session.deleted:
+            state = inspect(book)
+            if not any(
+                state.attrs[name].history.has_changes() for name in FACET_ATTRIBUTES
+            ):
+                continue
+            deltas.subtract(
+                facet_values(*(_previous(book, name) for name in FACET_ATTRIBUTES))
+            )
+            deltas.update(
+                facet_values(*(getattr(book, name) for name in FACET_ATTRIBUTES))
+            )
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_facet_deltas(session, flush_context) -> None:
+    deltas = _facet_deltas(session)
+    if not any(deltas.values()):
+        return
+    connection = session.connection()
+    table = BookFacet.__table__
+    dialect = connection.dialect.name
+    # Sorted so concurrent transactions lock facet rows in the same order
+    for (facet, value), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        if dialect == "mysql":
+            statement = mysql_insert(table).values(
+                facet=facet, value=value, count=delta
+            )
+            statement = statement.on_duplicate_key_update(count=table.c.count + delta)
+        elif dialect == "sqlite":
+            statement = sqlite_insert(table).values(
+                facet=facet, value=value, count=delta
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=["facet", "value"], set_={"count": table.c.count + delta}
+            )
+        else:
+            result = connection.execute(
+                update(table)
+                .where(table.c.facet == facet, table.c.value == value)
+                .values(count=table.c.count + delta)
+            )
+            if result.rowcount:
+                continue
+            statement = table.insert().values(facet=facet, value=value, count=delta)
+        connection.execute(statement)
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from flask_sqlalchemy.query import Query
+from sqlalchemy import Delete, and_, delete, or_
+
+from app.models import db
+
+
+class RevokedToken(db.Model):
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    # Rows can be garbage-collected once the token would have expired anyway
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    @staticmethod
+    def unexpired_since(last_id: int, gaps, now: datetime) -> Query:
+        """Unexpired rows past last_id or with one of the gap ids, in id order."""
+        unseen = RevokedToken.id > last_id
+        if gaps:
+            # The lower bound keeps it a primary key range seek despite the OR
+            unseen = and_(
+                RevokedToken.id >= min(gaps),
+                or_(unseen, RevokedToken.id.in_(gaps)),
+            )
+        return (
+            db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .filter(unseen, RevokedToken.expires_at > now)
+            .order_by(RevokedToken.id)
+        )
+
+    @staticmethod
+    def delete_expired(now: datetime) -> Delete:
+        return delete(RevokedToken).where(RevokedToken.expires_at <= now)
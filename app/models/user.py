@@ -2,12 +2,19 @@ from enum import Enum
 import logging
 import secrets
 import string
+from typing import Iterator, Optional
 
-from flask import Flask
 from flask_login import UserMixin
+from flask_sqlalchemy.query import Query
+
+from sqlalchemy import insert
 
 from app.models import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.credential_cache import credential_cache
+from app.utils.fieldsets import FieldSpec, serialize
+from app.utils.passwords import hash_password, hash_passwords
+from app.utils.user_cache import user_version_cache
+from werkzeug.security import check_password_hash
 
 # Correct the logging level
 logging.basicConfig(level=logging.INFO)
@@ -21,23 +28,52 @@ class UserRole(Enum):
     GUEST = "guest"
 
 
+# Changing any of these drops cached Basic-auth checks and issued tokens
+CREDENTIAL_FIELDS = {"username", "password", "role"}
+
+# Fields exposed by the API, usable with fields= on the user listing
+USER_FIELDS: FieldSpec = {
+    "id": (("id",), None),
+    "full_name": (("full_name",), None),
+    "username": (("username",), None),
+    "role": (("role",), lambda user: user.role.value),
+}
+
+
 class User(db.Model, UserMixin):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
     full_name = db.Column(db.String(255), nullable=False)
-    email = db.Column(db.String(255), nullable=False)
+    email = db.Column(db.String(255), nullable=False, index=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.Enum(UserRole), nullable=False)
+    # Embedded in issued JWTs; bumping it invalidates them
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    def to_dict(self, fields: Optional[list[str]] = None):
+        return serialize(self, USER_FIELDS, fields)
+
+    def credentials_changed(self) -> None:
+        """Invalidate cached Basic-auth checks and previously issued tokens."""
+        self.token_version = (self.token_version or 0) + 1
+        credential_cache.invalidate_user(self.id)
+        user_version_cache.invalidate(self.id)
 
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "full_name": self.full_name,
-            "username": self.username,
-            "role": self.role.value,
-        }
+    @staticmethod
+    def by_username(username: str) -> Query:
+        return User.query.filter_by(username=username)
+
+    @staticmethod
+    def values_in_use(column, values: list) -> Query:
+        """Rows of `column` (email, username) already holding one of `values`."""
+        return db.session.query(column).filter(column.in_(values))
+
+    @staticmethod
+    def load_token_version(user_id: int) -> Optional[int]:
+        row = db.session.query(User.token_version).filter(User.id == user_id).first()
+        return (row.token_version or 0) if row else None
 
     @staticmethod
     def generate_random_password(length: int = 8) -> str:
@@ -52,7 +88,7 @@ class User(db.Model, UserMixin):
     def create_user(
         full_name: str, username: str, email: str, password: str, role: UserRole
     ) -> "User":
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         return User(
             full_name=full_name,
             username=username,
@@ -63,10 +99,10 @@ class User(db.Model, UserMixin):
 
     @staticmethod
     def update_user_as_admin(user: "User", data: dict) -> "User":
+        # data is left as sent; callers may pass it on unchanged
+        role = UserRole(data["role"]) if "role" in data else None
         if "password" in data:
-            data["password"] = generate_password_hash(data["password"])
-        if "role" in data:
-            data["role"] = UserRole(data["role"])
+            user.password = hash_password(data["password"])
         if "full_name" in data:
             user.full_name = data["full_name"]
         if "username" in data:
@@ -74,19 +110,23 @@ class User(db.Model, UserMixin):
         if "email" in data:
             user.email = data["email"]
         if "role" in data:
-            user.role = data["role"]
+            user.role = role
+        if data.keys() & CREDENTIAL_FIELDS:
+            user.credentials_changed()
         return user
 
     @staticmethod
     def update_user_as_user(user: "User", data: dict) -> "User":
         if "password" in data:
-            data["password"] = generate_password_hash(data["password"])
+            user.password = hash_password(data["password"])
         if "full_name" in data:
             user.full_name = data["full_name"]
         if "username" in data:
             user.username = data["username"]
         if "email" in data:
             user.email = data["email"]
+        if data.keys() & CREDENTIAL_FIELDS:
+            user.credentials_changed()
         return user
 
     @staticmethod
@@ -94,171 +134,74 @@ class User(db.Model, UserMixin):
         return User.query.get(int(user_id))
 
     @staticmethod
-    def create_initial_users(app):
-        """Create initial users if they do not already exist."""
-        users = [
-            {
-                "full_name": "Admin",
-                "username": "admin",
-                "email": "admin@admin.com",
-                "role": UserRole.ADMIN,
-                "password": "admin123",
-            },
-            {
-                "full_name": "Alice Johnson",
-                "username": "alicej",
-                "email": "alice.johnson@example.com",
-                "role": UserRole.ADMIN,
-                "password": "AliceSecure1!",
-            },
-            {
-                "full_name": "Bob Smith",
-                "username": "bobsmith",
-                "email": "bob.smith@example.com",
-                "role": UserRole.USER,
-                "password": "BobStrongPwd2@",
-            },
-            {
-                "full_name": "Charlie Evans",
-                "username": "charliee",
-                "email": "charlie.evans@example.com",
-                "role": UserRole.GUEST,
-                "password": "CharlieGuest3#",
-            },
-            {
-                "full_name": "Diana Lopez",
-                "username": "dianal",
-                "email": "diana.lopez@example.com",
-                "role": UserRole.USER,
-                "password": "DianaUser4$",
-            },
-            {
-                "full_name": "Ethan Brown",
-                "username": "ethanb",
-                "email": "ethan.brown@example.com",
-                "role": UserRole.ADMIN,
-                "password": "EthanAdmin5%",
-            },
-            {
-                "full_name": "Fiona Garcia",
-                "username": "fionag",
-                "email": "fiona.garcia@example.com",
-                "role": UserRole.GUEST,
-                "password": "FionaGuest6^",
-            },
-            {
-                "full_name": "George Miller",
-                "username": "georgem",
-                "email": "george.miller@example.com",
-                "role": UserRole.USER,
-                "password": "GeorgeUser7&",
-            },
-            {
-                "full_name": "Hannah Wilson",
-                "username": "hannahw",
-                "email": "hannah.wilson@example.com",
-                "role": UserRole.ADMIN,
-                "password": "HannahAdmin8*",
-            },
-            {
-                "full_name": "Ian Clark",
-                "username": "ianclark",
-                "email": "ian.clark@example.com",
-                "role": UserRole.USER,
-                "password": "IanUser9(",
-            },
-            {
-                "full_name": "Julia Martinez",
-                "username": "juliam",
-                "email": "julia.martinez@example.com",
-                "role": UserRole.GUEST,
-                "password": "JuliaGuest0)",
-            },
-            {
-                "full_name": "Kevin Harris",
-                "username": "kevinh",
-                "email": "kevin.harris@example.com",
-                "role": UserRole.USER,
-                "password": "KevinPass11!",
-            },
-            {
-                "full_name": "Laura Lewis",
-                "username": "laural",
-                "email": "laura.lewis@example.com",
-                "role": UserRole.ADMIN,
-                "password": "LauraSecure12@",
-            },
-            {
-                "full_name": "Michael Young",
-                "username": "michaely",
-                "email": "michael.young@example.com",
-                "role": UserRole.USER,
-                "password": "MichaelStrong13#",
-            },
-            {
-                "full_name": "Nina Scott",
-                "username": "ninas",
-                "email": "nina.scott@example.com",
-                "role": UserRole.GUEST,
-                "password": "NinaGuest14$",
-            },
-            {
-                "full_name": "Oscar Adams",
-                "username": "oscara",
-                "email": "oscar.adams@example.com",
-                "role": UserRole.USER,
-                "password": "OscarPass15%",
-            },
-            {
-                "full_name": "Paula Roberts",
-                "username": "paular",
-                "email": "paula.roberts@example.com",
-                "role": UserRole.ADMIN,
-                "password": "PaulaSecure16^",
-            },
-            {
-                "full_name": "Quentin Baker",
-                "username": "quentinb",
-                "email": "quentin.baker@example.com",
-                "role": UserRole.GUEST,
-                "password": "QuentinGuest17&",
-            },
-            {
-                "full_name": "Rachel Turner",
-                "username": "rachelt",
-                "email": "rachel.turner@example.com",
-                "role": UserRole.USER,
-                "password": "RachelUser18*",
-            },
-            {
-                "full_name": "Samuel Phillips",
-                "username": "samuelp",
-                "email": "samuel.phillips@example.com",
-                "role": UserRole.USER,
-                "password": "SamuelSecure19(",
-            },
-            {
-                "full_name": "Tina Watson",
-                "username": "tinaw",
-                "email": "tina.watson@example.com",
-                "role": UserRole.GUEST,
-                "password": "TinaGuest20)",
-            },
+    def bulk_create_users(
+        users: list[dict], batch_size: int = 1000, workers: Optional[int] = None
+    ) -> dict:
+        """Insert users whose email and username are both unused.
+
+        Existing emails/usernames are fetched with IN lookups, passwords are
+        hashed in a process pool and rows are inserted in batches within a
+        single transaction.
+        """
+        emails = {user_data["email"] for user_data in users}
+        usernames = {user_data["username"] for user_data in users}
+        taken_emails, taken_usernames = set(), set()
+        for chunk in _chunks(list(emails), batch_size):
+            taken_emails.update(
+                email for (email,) in User.values_in_use(User.email, chunk)
+            )
+        for chunk in _chunks(list(usernames), batch_size):
+            taken_usernames.update(
+                username for (username,) in User.values_in_use(User.username, chunk)
+            )
+
+        # Validate every role before any hashing or writes happen
+        roles = [UserRole(user_data["role"]) for user_data in users]
+
+        new_users = []
+        for user_data, role in zip(users, roles):
+            email, username = user_data["email"], user_data["username"]
+            if email in taken_emails or username in taken_usernames:
+                continue
+            # Duplicates inside the batch itself are skipped as well
+            taken_emails.add(email)
+            taken_usernames.add(username)
+            new_users.append({**user_data, "role": role})
+
+        hashed_passwords = hash_passwords(
+            [user_data["password"] for user_data in new_users], workers=workers
+        )
+        rows = [
+            {
+                "full_name": user_data["full_name"],
+                "username": user_data["username"],
+                "email": user_data["email"],
+                "password": hashed_password,
+                "role": user_data["role"],
+            }
+            for user_data, hashed_password in zip(new_users, hashed_passwords)
         ]
+        # One transaction: a failure leaves none of the users behind
+        try:
+            for chunk in _chunks(rows, batch_size):
+                db.session.execute(insert(User), chunk)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {"created": len(rows), "skipped": len(users) - len(rows)}
+
+    @staticmethod
+    def create_initial_users(users: list[dict]) -> int:
+        """Create initial users if they do not already exist."""
+        result = User.bulk_create_users(users)
+        logger.info(
+            f"Added {result['created']} users, {result['skipped']} already existed."
+        )
+        return result["created"]
+
 
-        with app.app_context():
-            for user_data in users:
-                existing_user = User.query.filter_by(email=user_data["email"]).first()
-                if not existing_user:
-                    new_user = User.create_user(
-                        full_name=user_data["full_name"],
-                        username=user_data["username"],
-                        email=user_data["email"],
-                        role=user_data["role"],
-                        password=user_data["password"],
-                    )
-                    db.session.add(new_user)
-                    db.session.commit()
-                    logger.info(f"Added user: {user_data['full_name']}")
-                else:
-                    logger.info(f"user '{user_data['full_name']}' already exists.")
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
@@ -1,12 +1,20 @@
 import logging
 from http import HTTPStatus
-from flask_login import logout_user
 from flask_restx import Namespace, Resource
 from flask import request
 
 from app.models.user import UserRole
 from app.schemas.user_schema import user_login_response_schema, user_login_schema
-from app.utils.auth_utils import auth_required, generate_token, verify_user_basic
+from app.utils.auth_utils import (
+    auth_required,
+    end_session,
+    generate_token,
+    revoke_current_token,
+    too_many_attempts,
+    verify_user_basic,
+)
+from app.utils.credential_cache import credential_cache
+from app.utils.rate_limit import login_throttle
 
 # Correct the logging level
 logging.basicConfig(level=logging.INFO)
@@ -21,14 +29,20 @@ class Login(Resource):
     @auth_ns.response(HTTPStatus.OK, "Login successful", user_login_response_schema)
     @auth_ns.response(HTTPStatus.UNAUTHORIZED, "Unauthorized")
     @auth_ns.response(HTTPStatus.BAD_REQUEST, "Invalid input")
+    @auth_ns.response(HTTPStatus.TOO_MANY_REQUESTS, "Too many failed attempts")
     def post(self) -> tuple[dict, int]:
         """Log in a user and generate an authentication token."""
         data = request.json
         username = data.get("username")
         password = data.get("password")
 
+        client_ip = request.remote_addr or ""
+        if retry_after := login_throttle.retry_after(username, client_ip):
+            return too_many_attempts(retry_after)
+
         user = verify_user_basic(username, password)
         if not user:
+            login_throttle.record_failure(username, client_ip)
             return {"message": "Invalid username or password"}, HTTPStatus.UNAUTHORIZED
 
         token = generate_token(user)
@@ -46,5 +60,18 @@ class Logout(Resource):
     @auth_required([UserRole.ADMIN])
     def get(self) -> tuple[dict, int]:
         """Log out an admin user (admin only)."""
-        logout_user()
+        if request.headers.get("Authorization", "").startswith("Bearer "):
+            revoke_current_token()
+        end_session()
         return {"success": True, "message": "Logged out successfully"}, HTTPStatus.OK
+
+
+@auth_ns.route("/credential-cache")
+class CredentialCacheStats(Resource):
+    @auth_ns.response(HTTPStatus.OK, "Credential cache counters")
+    @auth_ns.response(HTTPStatus.UNAUTHORIZED, "Unauthorized")
+    @auth_ns.doc(security=["basic", "jwt"])
+    @auth_required([UserRole.ADMIN])
+    def get(self) -> tuple[dict, int]:
+        """Hit/miss counters of the Basic-auth credential cache (admin only)."""
+        return {"success": True, "data": credential_cache.stats()}, HTTPStatus.OK
@@ -3,9 +3,13 @@ import logging
 import mimetypes
 import os
 from flask_restx import Namespace, Resource
-from flask import Response, g, request
+from flask import Response, current_app, g, request, send_file
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import is_resource_modified
 
-from app.models.books import Book
+from app.models.book_facet import BookFacet
+from app.models.books import BOOK_FIELDS, Book
 from app.models import db
 from app.models.user import User
 
@@ -15,12 +19,47 @@ from app.schemas.book_schema import (
     book_response_schema,
     book_borrow_schema,
     book_request_schema_parser,
+    book_autocomplete_parser,
+    book_autocomplete_schema,
+    book_facets_parser,
+    book_facets_schema,
+    book_fields_parser,
     book_query_parser,
+    book_image_query_parser,
 )
 from app.models.user import UserRole
 
-from app.utils.auth_utils import auth_required
+from app.config.pagination import MAX_PER_PAGE
+from app.config.search import AUTOCOMPLETE_MAX_LIMIT, FACET_AUTHOR_LIMIT_MAX
+from app.config.uploads import COVER_MAX_AGE, RENDITION_SIZES
+from app.utils.auth_utils import auth_required, get_current_user
+from app.utils.autocomplete import autocomplete
+from app.utils.cover_store import (
+    CoverTooLargeError,
+    InvalidCoverError,
+    cover_abspath,
+    save_cover_stream,
+)
+from app.utils.fieldsets import (
+    InvalidFieldsError,
+    compile_serializer,
+    parse_fields,
+    projection,
+    serialize,
+)
 from app.utils.files import is_allowed_file
+from app.utils.pagination import (
+    COUNT_MODES,
+    InvalidCursorError,
+    clamp_per_page,
+    keyset_paginate,
+    listing_total,
+    order_clauses,
+)
+from app.utils.response_cache import cached_response
+from app.utils.search import apply_book_search
+from app.utils.sorting import InvalidSortError, parse_sort
+from app.utils.renditions import RENDITION_MIME, find_rendition, schedule_renditions
 
 # Correct the logging level
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +73,11 @@ class BooksList(Resource):
 
     @books_ns.expect(book_query_parser, validate=True)
     @books_ns.response(HTTPStatus.OK, "Books retrieved", book_list_schema)
+    @books_ns.response(
+        HTTPStatus.BAD_REQUEST,
+        "Invalid cursor, count mode, fields or sort, or cursor with unsorted q",
+    )
+    @cached_response("books")
     def get(self) -> Response:
         """Retrieve a list of books with pagination and filtering."""
         page = request.args.get("page", 1, type=int)
@@ -41,23 +85,83 @@ class BooksList(Resource):
         title = request.args.get("title", type=str)
         author = request.args.get("author", type=str)
         description = request.args.get("description", type=str)
+        q = request.args.get("q", type=str)
 
         query = Book.query
+        if q:
+            query = apply_book_search(query, q)
         if title:
             query = query.filter(Book.title.ilike(f"%{title}%"))
         if author:
             query = query.filter(Book.author.ilike(f"%{author}%"))
         if description:
-            query = query.filter(Book.genre.ilike(f"%{description}%"))
+            query = query.filter(Book.description.ilike(f"%{description}%"))
+        try:
+            fields = parse_fields(request.args.get("fields", type=str), BOOK_FIELDS)
+            sort = parse_sort(request.args.get("sort", type=str), Book)
+        except (InvalidFieldsError, InvalidSortError) as e:
+            return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
+        to_dict = compile_serializer(BOOK_FIELDS, fields)
+        # id order unless asked otherwise; always ends on id so cursors can seek
+        keys = sort or [(Book.id, False)]
+
+        cursor = request.args.get("cursor", type=str)
+        if cursor is not None and q and not sort:
+            # A cursor seeks on sort keys; relevance rank is not one of them
+            return {
+                "success": False,
+                "message": "Cursor paging of search results needs an explicit sort; "
+                "use page numbers for relevance order.",
+            }, HTTPStatus.BAD_REQUEST
+        # Cursor crawls skip the total unless asked; page numbers need it
+        count_mode = request.args.get(
+            "count", "none" if cursor is not None else "estimated", type=str
+        )
+        if count_mode not in COUNT_MODES:
+            return {
+                "success": False,
+                "message": f"count must be one of: {', '.join(COUNT_MODES)}.",
+            }, HTTPStatus.BAD_REQUEST
+        total = listing_total(query, "books", request.args, count_mode)
+        if fields:
+            # SELECT only what the fieldset renders; rows are not loaded as Books
+            query = query.with_entities(
+                *projection(
+                    Book, BOOK_FIELDS, fields, extra=tuple(col.key for col, _ in keys)
+                )
+            )
+
+        if cursor is not None:
+            # Keyset mode: seek past the last (sort key, id) instead of OFFSET
+            try:
+                result = keyset_paginate(query, keys, cursor, per_page)
+            except InvalidCursorError as e:
+                return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
+            return {
+                "success": True,
+                "data": [to_dict(book) for book in result.items],
+                "total": total,
+                "per_page": clamp_per_page(per_page),
+                "next_cursor": result.next_cursor,
+            }, HTTPStatus.OK
 
-        books_query = query.paginate(page=page, per_page=per_page, error_out=False)
+        if sort:
+            query = query.order_by(None).order_by(*order_clauses(sort))
+        books_query = query.paginate(
+            page=page,
+            per_page=per_page,
+            max_per_page=MAX_PER_PAGE,
+            error_out=False,
+            count=False,
+        )
+        books_query.total = total
         books = books_query.items
 
         return {
             "success": True,
-            "data": [book.to_dict() for book in books],
+            "data": [to_dict(book) for book in books],
             "total": books_query.total,
-            "pages": books_query.pages,
+            "pages": books_query.pages if total is not None else None,
             "current_page": books_query.page,
             "per_page": books_query.per_page,
         }, HTTPStatus.OK
@@ -65,16 +169,16 @@ class BooksList(Resource):
     @books_ns.expect(book_schema_parser, validate=True)
     @books_ns.response(HTTPStatus.CREATED, "Book added", book_response_schema)
     @books_ns.response(HTTPStatus.BAD_REQUEST, "Invalid input")
+    @books_ns.response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Image too large")
     @books_ns.response(HTTPStatus.UNAUTHORIZED, "Unauthorized")
     @books_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server issue")
     @books_ns.doc(security=["basic", "jwt"])
     @auth_required([UserRole.ADMIN])
     def post(self) -> Response:
         """Add a new book to the database (admin only)."""
+        # Outside the try so 400/413 from form parsing are not turned into 500
+        args = book_schema_parser.parse_args()
         try:
-
-            args = book_schema_parser.parse_args()
-
             image_file = args["image"]
             if not is_allowed_file(image_file.filename):
                 return {
@@ -82,7 +186,7 @@ class BooksList(Resource):
                     "message": "Invalid file type. Allowed types are: png, jpg, jpeg, gif.",
                 }, HTTPStatus.BAD_REQUEST
 
-            image_data = image_file.read()
+            cover = save_cover_stream(image_file.stream)
             title = args["title"]
             author = args["author"]
             description = args["description"]
@@ -93,12 +197,20 @@ class BooksList(Resource):
                 author=author,
                 description=description,
                 isbn=isbn,
-                image=image_data,
             )
+            book.set_cover(cover)
             db.session.add(book)
             db.session.commit()
+            schedule_renditions(book.image_hash, book.image_path)
 
             return {"success": True, "data": book.to_dict()}, HTTPStatus.CREATED
+        except CoverTooLargeError as e:
+            return {
+                "success": False,
+                "message": str(e),
+            }, HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        except InvalidCoverError as e:
+            return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
         except Exception as e:
             logger.error(f"An error occurred: {str(e)}")
             return {
@@ -107,23 +219,69 @@ class BooksList(Resource):
             }, HTTPStatus.INTERNAL_SERVER_ERROR
 
 
+@books_ns.route("/autocomplete")
+class BookAutocomplete(Resource):
+    @books_ns.expect(book_autocomplete_parser, validate=True)
+    @books_ns.response(HTTPStatus.OK, "Suggestions", book_autocomplete_schema)
+    def get(self) -> Response:
+        """Typo-tolerant title and author suggestions for a search box."""
+        q = request.args.get("q", "", type=str)
+        limit = request.args.get("limit", 10, type=int)
+        limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
+        return {"success": True, "data": autocomplete.suggest(q, limit)}, HTTPStatus.OK
+
+
+@books_ns.route("/facets")
+class BookFacets(Resource):
+    @books_ns.expect(book_facets_parser, validate=True)
+    @books_ns.response(HTTPStatus.OK, "Facet counts", book_facets_schema)
+    # Book writes move the counters; rebuild-facets rewrites only book_facets
+    @cached_response("books", "book_facets")
+    def get(self) -> Response:
+        """Book counts by author, availability and borrowed state."""
+        author_limit = request.args.get("author_limit", 20, type=int)
+        author_limit = max(1, min(author_limit, FACET_AUTHOR_LIMIT_MAX))
+        return {
+            "success": True,
+            "data": BookFacet.counts(author_limit),
+        }, HTTPStatus.OK
+
+
 @books_ns.route("/<int:book_id>")
 class BooksResource(Resource):
+    @books_ns.expect(book_fields_parser, validate=True)
     @books_ns.response(HTTPStatus.OK, "Book retrieved", book_response_schema)
+    @books_ns.response(HTTPStatus.BAD_REQUEST, "Invalid fields")
     @books_ns.response(HTTPStatus.NOT_FOUND, "Book not found")
     @books_ns.response(HTTPStatus.UNAUTHORIZED, "Unauthorized")
     @books_ns.doc(security=["basic", "jwt"])
     @auth_required([UserRole.ADMIN, UserRole.USER])
+    @cached_response("books")
     def get(self, book_id: int) -> Response:
         """Retrieve a specific book by ID."""
-        book = Book.query.get(book_id)
+        try:
+            fields = parse_fields(request.args.get("fields", type=str), BOOK_FIELDS)
+        except InvalidFieldsError as e:
+            return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
+        if fields:
+            book = (
+                Book.query.with_entities(*projection(Book, BOOK_FIELDS, fields))
+                .filter(Book.id == book_id)
+                .first()
+            )
+        else:
+            book = Book.query.get(book_id)
         if book:
-            return {"success": True, "data": book.to_dict()}, HTTPStatus.OK
+            return {
+                "success": True,
+                "data": serialize(book, BOOK_FIELDS, fields),
+            }, HTTPStatus.OK
         return {"success": False, "message": "Book not found"}, HTTPStatus.NOT_FOUND
 
     @books_ns.expect(book_request_schema_parser, validate=True)
     @books_ns.response(HTTPStatus.CREATED, "Book updated", book_response_schema)
     @books_ns.response(HTTPStatus.BAD_REQUEST, "Invalid input")
+    @books_ns.response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Image too large")
     @books_ns.response(HTTPStatus.UNAUTHORIZED, "Unauthorized")
     @books_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server issue")
     @books_ns.doc(security=["basic", "jwt"])
@@ -135,7 +293,12 @@ class BooksResource(Resource):
         try:
             if book:
                 if image := args.get("image"):
-                    book.image = image.read()
+                    if not is_allowed_file(image.filename):
+                        return {
+                            "success": False,
+                            "message": "Invalid file type. Allowed types are: png, jpg, jpeg, gif.",
+                        }, HTTPStatus.BAD_REQUEST
+                    book.set_cover(save_cover_stream(image.stream))
                 if title := args.get("title"):
                     book.title = title
                 if author := args.get("author"):
@@ -147,7 +310,17 @@ class BooksResource(Resource):
                 if available := args.get("available"):
                     book.available = available
                 db.session.commit()
+                if image:
+                    # Only once the new cover is stored against the book
+                    schedule_renditions(book.image_hash, book.image_path)
                 return {"success": True, "data": book.to_dict()}, HTTPStatus.OK
+        except CoverTooLargeError as e:
+            return {
+                "success": False,
+                "message": str(e),
+            }, HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        except InvalidCoverError as e:
+            return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
         except Exception as e:
             logger.error(f"An error occurred: {str(e)}")
             return {
@@ -161,9 +334,9 @@ class BooksResource(Resource):
     @books_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server issue")
     @books_ns.doc(security=["basic", "jwt"])
     @auth_required([UserRole.ADMIN])
-    def delete(self, id: int) -> Response:
+    def delete(self, book_id: int) -> Response:
         """Delete a book from the database (admin only)."""
-        book = Book.query.get(id)
+        book = Book.query.get(book_id)
         if book:
             db.session.delete(book)
             db.session.commit()
@@ -171,23 +344,97 @@ class BooksResource(Resource):
         return {"success": False, "message": "Book not found"}, HTTPStatus.NOT_FOUND
 
 
+def set_cover_cache_headers(
+    response: Response, book: Book, etag: str, immutable: bool
+) -> Response:
+    response.set_etag(etag)
+    response.last_modified = book.image_updated_at
+    response.accept_ranges = "bytes"
+    response.cache_control.public = True
+    if immutable and request.args.get("v") == book.image_hash:
+        # Versioned URL: the bytes behind it can never change
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = COVER_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = None
+        response.cache_control.no_cache = True
+    return response
+
+
 @books_ns.route("/<int:book_id>/image")
 class BookServeImage(Resource):
+    @books_ns.expect(book_image_query_parser)
     @books_ns.response(
         HTTPStatus.OK, "Image retrieved as binary data (e.g., image/jpeg)"
     )
+    @books_ns.response(HTTPStatus.PARTIAL_CONTENT, "Requested byte range")
+    @books_ns.response(HTTPStatus.NOT_MODIFIED, "Image not modified")
+    @books_ns.response(
+        HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, "Range not satisfiable"
+    )
+    @books_ns.response(HTTPStatus.BAD_REQUEST, "Invalid input")
     @books_ns.response(HTTPStatus.NOT_FOUND, "Image not found")
     @books_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server issue")
-    @books_ns.produces(["image/jpeg"])  # Specify the MIME type of the response
+    @books_ns.produces(["image/jpeg", "image/png", "image/gif"])
     def get(self, book_id: int) -> Response:
         """Serve the image of a specific book."""
-        book = Book.query.get(book_id)
+        size = request.args.get("size", type=str)
+        if size and size not in RENDITION_SIZES:
+            return {
+                "message": f"Invalid size. Allowed sizes are: {', '.join(RENDITION_SIZES)}."
+            }, HTTPStatus.BAD_REQUEST
+
+        # Only the cover columns; title/description are not needed to serve it
+        book = Book.query.options(
+            load_only(
+                Book.image_hash,
+                Book.image_path,
+                Book.image_mime,
+                Book.image_updated_at,
+            )
+        ).get(book_id)
         if not book:
             return {"message": "Book not found"}, HTTPStatus.NOT_FOUND
+        if not book.image_path:
+            return {"message": "Image not found"}, HTTPStatus.NOT_FOUND
+
+        path = cover_abspath(book.image_path)
+        mime_type = book.image_mime
+        etag = book.image_hash
+        # Until the rendition exists the original is served, and must not be
+        # cached as if it were the requested size
+        immutable = not size
+        if size and (rendition_path := find_rendition(book.image_hash, size)):
+            path = rendition_path
+            mime_type = RENDITION_MIME
+            etag = f"{book.image_hash}-{size}"
+            immutable = True
+
+        # Answer revalidations from the stored hash without opening the file
+        if not is_resource_modified(
+            request.environ, etag=etag, last_modified=book.image_updated_at
+        ):
+            return set_cover_cache_headers(
+                Response(status=HTTPStatus.NOT_MODIFIED), book, etag, immutable
+            )
 
         try:
-            mime_type = "image/jpeg"
-            return Response(book.image, mimetype=mime_type)
+            # send_file hands the open file to the server (wsgi.file_wrapper /
+            # X-Sendfile) so the bytes never pass through Python. Range and
+            # If-Range are answered from the file with a 206 of just that
+            # slice; behind X-Sendfile the front server applies the range.
+            response = send_file(
+                path,
+                mimetype=mime_type,
+                etag=etag,
+                last_modified=book.image_updated_at,
+                conditional=not current_app.config["USE_X_SENDFILE"],
+            )
+            return set_cover_cache_headers(response, book, etag, immutable)
+        except HTTPException:
+            # 416 for unsatisfiable ranges
+            raise
         except Exception as e:
             logger.error(f"An error occurred: {str(e)}")
             return {
@@ -208,8 +455,7 @@ class BookBorrowResrouce(Resource):
         try:
             args = book_schema_parser.parse_args()
             book = Book.query.get(book_id)
-            user_id = g.current_user["user_id"]
-            user = User.query.get(user_id)
+            user = get_current_user()
             if book and user:
                 book.borrowed_by = user.id
                 book.borrowed_until = args["borrowed_until"]
@@ -237,9 +483,9 @@ class BookReturnResrouce(Resource):
     @books_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server issue")
     @books_ns.doc(security=["basic, jwt"])
     @auth_required([UserRole.ADMIN, UserRole.USER])
-    def put(self, id: int) -> Response:
+    def put(self, book_id: int) -> Response:
         """Return a borrowed book to the library."""
-        book = Book.query.get(id)
+        book = Book.query.get(book_id)
         if book:
             book.borrowed_by = None
             book.borrowed_until = None
@@ -8,12 +8,29 @@ from app.schemas.user_schema import (
     user_schema,
     user_update_request_model_schema,
     user_query_parser,
+    user_import_request_schema,
+    user_import_response_schema,
 )
+from app.config.auth import USER_IMPORT_MAX
+from app.config.pagination import MAX_PER_PAGE
 from app.models import db
-from app.models.user import User, UserRole
+from app.models.user import CREDENTIAL_FIELDS, USER_FIELDS, User, UserRole
 
-from app.utils.auth_utils import auth_required
+from app.utils.auth_utils import auth_required, get_current_user
 from app.utils.emai import send_registration_email
+from app.utils.fieldsets import (
+    InvalidFieldsError,
+    compile_serializer,
+    parse_fields,
+    projection,
+)
+from app.utils.pagination import (
+    COUNT_MODES,
+    InvalidCursorError,
+    clamp_per_page,
+    keyset_paginate,
+    listing_total,
+)
 
 users_ns = Namespace("User", description="User management")
 
@@ -23,6 +40,7 @@ class UsersList(Resource):
 
     @users_ns.expect(user_query_parser, validate=True)
     @users_ns.response(HTTPStatus.OK, "List of users", user_response_schema)
+    @users_ns.response(HTTPStatus.BAD_REQUEST, "Invalid cursor, count mode or fields")
     @users_ns.doc(security=["basic", "jwt"])
     @auth_required([UserRole.ADMIN, UserRole.USER])
     def get(self) -> Response:
@@ -65,15 +83,59 @@ class UsersList(Resource):
         # email like  %admin@admin% AND
         # role like %ADMIN% AND
         # full_name  like %adam%
+        try:
+            fields = parse_fields(request.args.get("fields", type=str), USER_FIELDS)
+        except InvalidFieldsError as e:
+            return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
+        to_dict = compile_serializer(USER_FIELDS, fields)
+
+        cursor = request.args.get("cursor", type=str)
+        # Cursor crawls skip the total unless asked; page numbers need it
+        count_mode = request.args.get(
+            "count", "none" if cursor is not None else "estimated", type=str
+        )
+        if count_mode not in COUNT_MODES:
+            return {
+                "success": False,
+                "message": f"count must be one of: {', '.join(COUNT_MODES)}.",
+            }, HTTPStatus.BAD_REQUEST
+        total = listing_total(query, "users", request.args, count_mode)
+        if fields:
+            # SELECT only what the fieldset renders; rows are not loaded as Users
+            query = query.with_entities(
+                *projection(User, USER_FIELDS, fields, extra=("id",))
+            )
+
+        if cursor is not None:
+            # Keyset mode: WHERE id > :last_id ORDER BY id LIMIT per_page + 1
+            try:
+                result = keyset_paginate(query, [(User.id, False)], cursor, per_page)
+            except InvalidCursorError as e:
+                return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
+            return {
+                "success": True,
+                "data": [to_dict(user) for user in result.items],
+                "total": total,
+                "per_page": clamp_per_page(per_page),
+                "next_cursor": result.next_cursor,
+            }, HTTPStatus.OK
+
         # lMIT= per_page
         # OFFSET =page
-        users_query = query.paginate(page=page, per_page=per_page, error_out=False)
+        users_query = query.paginate(
+            page=page,
+            per_page=per_page,
+            max_per_page=MAX_PER_PAGE,
+            error_out=False,
+            count=False,
+        )
+        users_query.total = total
         users = users_query.items
         return {
             "success": True,
-            "data": [user.to_dict() for user in users],
+            "data": [to_dict(user) for user in users],
             "total": users_query.total,
-            "pages": users_query.pages,
+            "pages": users_query.pages if total is not None else None,
             "current_page": users_query.page,
             "per_page": users_query.per_page,
         }, HTTPStatus.OK
@@ -108,6 +170,43 @@ class UsersList(Resource):
         return {"success": True, "data": user.to_dict()}, HTTPStatus.CREATED
 
 
+@users_ns.route("/import")
+class UsersImport(Resource):
+    @users_ns.expect(user_import_request_schema, validate=True)
+    @users_ns.response(
+        HTTPStatus.CREATED, "Users imported", user_import_response_schema
+    )
+    @users_ns.response(HTTPStatus.BAD_REQUEST, "Invalid input")
+    @users_ns.response(HTTPStatus.UNAUTHORIZED, "Unauthorized")
+    @users_ns.response(HTTPStatus.FORBIDDEN, "Forbidden")
+    @users_ns.response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Too many users")
+    @users_ns.response(HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server error")
+    @users_ns.doc(security=["basic", "jwt"])
+    @auth_required([UserRole.ADMIN])
+    def post(self) -> Response:
+        """Create many users at once, skipping existing emails/usernames (admin only)."""
+        users = request.json["users"]
+        if len(users) > USER_IMPORT_MAX:
+            return {
+                "success": False,
+                "message": f"At most {USER_IMPORT_MAX} users per import; "
+                "use `flask users import` for larger files.",
+            }, HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        try:
+            result = User.bulk_create_users(users)
+        except ValueError as e:
+            db.session.rollback()
+            return {"success": False, "message": str(e)}, HTTPStatus.BAD_REQUEST
+        except Exception as e:
+            db.session.rollback()
+            return {
+                "success": False,
+                "message": str(e),
+            }, HTTPStatus.INTERNAL_SERVER_ERROR
+
+        return {"success": True, **result}, HTTPStatus.CREATED
+
+
 @users_ns.route("/me")
 class MeResource(Resource):
     @users_ns.expect(user_update_request_model_schema, validate=True)
@@ -121,16 +220,15 @@ class MeResource(Resource):
     @auth_required([UserRole.ADMIN, UserRole.USER])
     def put(self) -> Response:
         """Update the currently authenticated user."""
-        user_id = g.current_user["user_id"]
-
-        user = User.load_user(user_id)
+        user = get_current_user()
         data = request.json
         if not user:
             return {"message": "User not found"}, HTTPStatus.NOT_FOUND
 
+        # Chosen by the role before the update; a self-demotion must not run both
         if user.role == UserRole.ADMIN:
             user = User.update_user_as_admin(user, data)
-        if user.role == UserRole.USER:
+        elif user.role == UserRole.USER:
             user = User.update_user_as_user(user, data)
 
         db.session.commit()
@@ -146,8 +244,7 @@ class MeResource(Resource):
     @auth_required([UserRole.ADMIN, UserRole.USER])
     def delete(self) -> Response:
         """Delete the currently authenticated user."""
-        user_id = g.current_user["user_id"]
-        user = User.load_user(user_id)
+        user = get_current_user()
         if not user:
             return {"message": "User not found"}, HTTPStatus.NOT_FOUND
 
@@ -209,6 +306,8 @@ class UsersResource(Resource):
             user.role = data["role"]
         if "is_active" in data:
             user.is_active = data["is_active"]
+        if data.keys() & CREDENTIAL_FIELDS:
+            user.credentials_changed()
 
         try:
             db.session.commit()
@@ -1,4 +1,11 @@
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from flask import current_app, make_response
 from flask_restx import Api
+from flask_restx.representations import output_json as stdlib_output_json
 
 api = Api(
     title="BOOK LIBRARY APP",
@@ -17,3 +24,27 @@ api = Api(
         },
     },
 )
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    """Encode a response payload with orjson (callers check it is installed)."""
+    option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option)
+
+
+@api.representation("application/json")
+def output_json(data, code, headers=None):
+    """
+    Encode JSON responses with orjson when it is installed.
+
+    Falls back to flask-restx's encoder without orjson, or when RESTX_JSON
+    asks for encoder settings orjson does not understand.
+    """
+    if orjson is None or current_app.config.get("RESTX_JSON"):
+        return stdlib_output_json(data, code, headers)
+
+    response = make_response(dumps(data, indent=current_app.debug), code)
+    response.headers.extend(headers or {})
+    return response
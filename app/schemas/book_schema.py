@@ -2,6 +2,10 @@ from flask_restx import fields, reqparse
 from werkzeug.datastructures import FileStorage
 
 
+from app.config.pagination import MAX_PER_PAGE
+from app.config.search import AUTOCOMPLETE_MAX_LIMIT, FACET_AUTHOR_LIMIT_MAX
+from app.utils.pagination import COUNT_MODES
+from app.config.uploads import RENDITION_SIZES
 from app.schemas import api
 
 
@@ -11,7 +15,42 @@ book_query_parser.add_argument(
     "page", type=int, default=1, help="Page number for pagination"
 )
 book_query_parser.add_argument(
-    "per_page", type=int, default=10, help="Number of items per page"
+    "per_page",
+    type=int,
+    default=10,
+    help=f"Number of items per page (at most {MAX_PER_PAGE})",
+)
+book_query_parser.add_argument(
+    "cursor",
+    type=str,
+    required=False,
+    help="Opaque cursor from next_cursor; pass it empty to start cursor paging",
+)
+book_query_parser.add_argument(
+    "fields",
+    type=str,
+    required=False,
+    help="Comma-separated fields to return, e.g. id,title,author,available",
+)
+book_query_parser.add_argument(
+    "sort",
+    type=str,
+    required=False,
+    help="Sort key, prefix with - for descending: title, author, available or id",
+)
+book_query_parser.add_argument(
+    "count",
+    type=str,
+    required=False,
+    choices=COUNT_MODES,
+    help="How to compute total: exact, estimated (cached, default for pages) "
+    "or none (default for cursors)",
+)
+book_query_parser.add_argument(
+    "q",
+    type=str,
+    required=False,
+    help="Full-text search over title, author and description (ranked, prefix match)",
 )
 book_query_parser.add_argument(
     "title", type=str, required=False, help="Filter by book title"
@@ -23,6 +62,45 @@ book_query_parser.add_argument(
     "description", type=str, required=False, help="Filter by book description"
 )
 
+book_autocomplete_parser = reqparse.RequestParser()
+book_autocomplete_parser.add_argument(
+    "q", type=str, required=True, help="What has been typed so far (2+ characters)"
+)
+book_autocomplete_parser.add_argument(
+    "limit",
+    type=int,
+    default=10,
+    help=f"Suggestions to return (at most {AUTOCOMPLETE_MAX_LIMIT})",
+)
+
+book_facets_parser = reqparse.RequestParser()
+book_facets_parser.add_argument(
+    "author_limit",
+    type=int,
+    default=20,
+    help=f"Most frequent authors to return (at most {FACET_AUTHOR_LIMIT_MAX})",
+)
+
+book_fields_parser = reqparse.RequestParser()
+book_fields_parser.add_argument(
+    "fields",
+    type=str,
+    required=False,
+    help="Comma-separated fields to return, e.g. id,title,author",
+)
+
+book_image_query_parser = reqparse.RequestParser()
+book_image_query_parser.add_argument(
+    "size",
+    type=str,
+    required=False,
+    choices=tuple(RENDITION_SIZES),
+    help="Cover rendition to serve (falls back to the original)",
+)
+book_image_query_parser.add_argument(
+    "v", type=str, required=False, help="Cover version (content hash)"
+)
+
 book_schema_parser = reqparse.RequestParser()  # form data schema
 #  input text
 book_schema_parser.add_argument(
@@ -88,6 +166,7 @@ book_schema = api.model(
         "available": fields.Boolean(readonly=True),
         "borrowed_by": fields.Integer(readonly=True),
         "borrowed_unilt": fields.String(readonly=True),
+        "image_url": fields.String(readonly=True),
     },
 )
 
@@ -111,6 +190,52 @@ book_list_schema = api.model(
         "pages": fields.Integer(),
         "current_page": fields.Integer(),
         "per_page": fields.Integer(),
+        "next_cursor": fields.String(description="Cursor for the next page"),
+    },
+)
+
+book_suggestion_schema = api.model(
+    "BookSuggestionModel",
+    {
+        "value": fields.String(description="Title or author name"),
+        "field": fields.String(description="title or author"),
+        "books": fields.Integer(description="Books with this value"),
+        "score": fields.Float(description="Share of the typed trigrams matched"),
+    },
+)
+
+book_autocomplete_schema = api.model(
+    "BookAutocompleteResponseModel",
+    {
+        "success": fields.Boolean(),
+        "data": fields.List(fields.Nested(book_suggestion_schema)),
+    },
+)
+
+book_facet_count_schema = api.model(
+    "BookFacetCountModel",
+    {
+        "value": fields.String(),
+        "count": fields.Integer(),
+    },
+)
+
+book_facets_schema = api.model(
+    "BookFacetsResponseModel",
+    {
+        "success": fields.Boolean(),
+        "data": fields.Nested(
+            api.model(
+                "BookFacetsModel",
+                {
+                    "author": fields.List(fields.Nested(book_facet_count_schema)),
+                    "availability": fields.Raw(
+                        example={"available": 12, "unavailable": 3}
+                    ),
+                    "borrowed": fields.Raw(example={"borrowed": 3, "free": 12}),
+                },
+            )
+        ),
     },
 )
 
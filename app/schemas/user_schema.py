@@ -3,13 +3,40 @@ from app.schemas import api
 
 from flask_restx import reqparse
 
+from app.config.auth import USER_IMPORT_MAX
+from app.config.pagination import MAX_PER_PAGE
+from app.utils.pagination import COUNT_MODES
+
 # Define the schema parser for query parameters
 user_query_parser = reqparse.RequestParser()
 user_query_parser.add_argument(
     "page", type=int, default=1, help="Page number for pagination"
 )
 user_query_parser.add_argument(
-    "per_page", type=int, default=10, help="Number of items per page"
+    "per_page",
+    type=int,
+    default=10,
+    help=f"Number of items per page (at most {MAX_PER_PAGE})",
+)
+user_query_parser.add_argument(
+    "cursor",
+    type=str,
+    required=False,
+    help="Opaque cursor from next_cursor; pass it empty to start cursor paging",
+)
+user_query_parser.add_argument(
+    "fields",
+    type=str,
+    required=False,
+    help="Comma-separated fields to return, e.g. id,username",
+)
+user_query_parser.add_argument(
+    "count",
+    type=str,
+    required=False,
+    choices=COUNT_MODES,
+    help="How to compute total: exact, estimated (cached, default for pages) "
+    "or none (default for cursors)",
 )
 user_query_parser.add_argument(
     "full_name", type=str, required=False, help="Filter by full name"
@@ -38,6 +65,37 @@ user_request_model_schema = api.model(
         ),
     },
 )
+user_import_item_schema = api.model(
+    "UserImportItemModel",
+    {
+        "full_name": fields.String(required=True, description="Full name"),
+        "username": fields.String(required=True, description="Username"),
+        "email": fields.String(required=True, description="Email"),
+        "password": fields.String(required=True, description="Password"),
+        "role": fields.String(
+            required=True, description="User role (e.g., admin, user)"
+        ),
+    },
+)
+user_import_request_schema = api.model(
+    "UserImportRequestModel",
+    {
+        "users": fields.List(
+            fields.Nested(user_import_item_schema),
+            required=True,
+            min_items=1,
+            description=f"At most {USER_IMPORT_MAX} users per request",
+        ),
+    },
+)
+user_import_response_schema = api.model(
+    "UserImportResponseModel",
+    {
+        "success": fields.Boolean(),
+        "created": fields.Integer(),
+        "skipped": fields.Integer(),
+    },
+)
 user_update_request_model_schema = api.model(
     "UserUpdateRequestModel",
     {
@@ -71,6 +129,9 @@ user_response_schema = api.model(
         "pages": fields.Integer(required=False),
         "current_page": fields.Integer(required=False),
         "per_page": fields.Integer(required=False),
+        "next_cursor": fields.String(
+            required=False, description="Cursor for the next page"
+        ),
     },
 )
 user_login_schema = api.model(
@@ -1,23 +1,32 @@
 import base64
-from datetime import timedelta
+from datetime import datetime, timedelta
 from functools import wraps
 from http import HTTPStatus
 import json
 import logging
 from typing import Any, Optional
 
-from flask import Flask, g, request
+from flask import Flask, g, request, session
 from flask_httpauth import HTTPBasicAuth
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
+    get_jwt,
     get_jwt_identity,
     verify_jwt_in_request,
 )
-from flask_login import login_user
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_login import login_user, logout_user
+from jwt.exceptions import PyJWTError
 
+from app.config.auth import JWT_STATELESS, SESSIONLESS_API
 from app.models.user import User, UserRole
 from app.models import db
+from app.utils.credential_cache import credential_cache
+from app.utils.passwords import hash_password, needs_rehash
+from app.utils.rate_limit import login_throttle
+from app.utils.revocation import revocation_list
+from app.utils.user_cache import user_version_cache
 
 # Correct the logging level
 logging.basicConfig(level=logging.INFO)
@@ -32,22 +41,51 @@ def init_jwt(app: Flask) -> None:
     jwt_auth.init_app(app)
 
 
+@jwt_auth.token_in_blocklist_loader
+def is_token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
+    return revocation_list.is_revoked(jwt_payload["jti"])
+
+
+def revoke_current_token() -> None:
+    """Revoke the Bearer token of the current request until it expires."""
+    claims = get_jwt()
+    revocation_list.revoke(claims["jti"], datetime.utcfromtimestamp(claims["exp"]))
+
+
 def generate_token(user: User) -> str:
     user_data = json.dumps(user.to_dict())
-    expires = timedelta(day=1)
-    token = create_access_token(identity=user_data, expires_delta=expires)
+    expires = timedelta(days=1)
+    # Role and token version let auth_required authorize without a user lookup
+    token = create_access_token(
+        identity=user_data,
+        expires_delta=expires,
+        additional_claims={"role": user.role.value, "ver": user.token_version},
+    )
 
     return token
 
 
 def verify_user_basic(username: str, password: str) -> Optional[User]:
-    user = User.query.filter_by(username=username).first()  #  None | {usern....}
-
-    if user and User.check_password(user.password, password):
-        login_user(user)
+    user = User.by_username(username).first()  #  None | {usern....}
+    if not user:
+        return None
+
+    # A recent successful check for the same pair skips the slow KDF
+    verified = credential_cache.is_verified(username, password, user.id, user.password)
+    if not verified and User.check_password(user.password, password):
+        if needs_rehash(user.password):
+            # Move the stored hash to the current policy while we have the password
+            user.password = hash_password(password)
+            db.session.commit()
+        credential_cache.remember(username, password, user.id, user.password)
+        verified = True
+
+    if verified:
+        start_session(user)
         g.current_user = {
             "username": user.username,
             "user_id": user.id,
+            "role": user.role,
         }
 
         return user
@@ -55,25 +93,74 @@ def verify_user_basic(username: str, password: str) -> Optional[User]:
     return None
 
 
-def verify_user_jwt() -> Optional[User]:
-    verify_jwt_in_request()
+def verify_user_jwt() -> Optional[dict]:
+    try:
+        verify_jwt_in_request()
+    except (JWTExtendedException, PyJWTError) as e:
+        # Revoked, expired or malformed tokens are plain 401s
+        logger.info(f"Rejected token: {e}")
+        return None
 
     user_identity = json.loads(get_jwt_identity())
-    user_id = user_identity["user_id"]
+    user_id = user_identity["id"]
+
+    if JWT_STATELESS:
+        claims = get_jwt()
+        # Tokens issued before the user's last credential change are rejected
+        current = user_version_cache.get(user_id, User.load_token_version)
+        if current is None or (claims.get("ver") or 0) != current:
+            return None
+
+        # A role change bumps the version, so a current token's role claim holds
+        g.current_user = {
+            "username": user_identity["username"],
+            "user_id": user_id,
+            "role": UserRole(claims["role"]),
+        }
+        return g.current_user
+
     user = User.load_user(user_id)
 
     if user:
-        login_user(user)
+        start_session(user)
         g.current_user = {
             "username": user.username,
             "user_id": user.id,
+            "role": user.role,
         }
 
-        return user
+        return g.current_user
 
     return None
 
 
+def get_current_user() -> Optional[User]:
+    """Load the authenticated user's row, once per request, for routes that need it."""
+    if "current_user_row" not in g:
+        g.current_user_row = User.load_user(g.current_user["user_id"])
+    return g.current_user_row
+
+
+def too_many_attempts(retry_after: int) -> tuple[dict, int, dict]:
+    return (
+        {"message": "Too many failed login attempts, try again later"},
+        HTTPStatus.TOO_MANY_REQUESTS,
+        {"Retry-After": str(retry_after)},
+    )
+
+
+def start_session(user: User) -> None:
+    """Log the user into the browser session unless the API is sessionless."""
+    if not SESSIONLESS_API:
+        login_user(user)
+
+
+def end_session() -> None:
+    # logout_user() always rewrites the cookie, so only call it for real sessions
+    if "_user_id" in session:
+        logout_user()
+
+
 def get_user_metadata(auth_header: str) -> tuple[str, str]:
     # `Basic dXNlcjpwYXNzd29yZA==` => [ 'Basic', 'dXNlcjpwYXNzd29yZA==']
     base64_credentials_meta = auth_header.split(" ")
@@ -94,16 +181,21 @@ def auth_required(allowed_roles: Optional[list[UserRole]] = None):
             auth_header = request.headers.get("Authorization")
 
             if auth_header and auth_header.startswith("Bearer "):
-                user = verify_user_jwt()  # User | None
+                user = verify_user_jwt()  # dict | None
 
                 if not user:
                     return {"message": "Invalid credentials"}, HTTPStatus.UNAUTHORIZED
 
             elif auth_header and auth_header.startswith("Basic "):
                 username, password = get_user_metadata(auth_header)
+                client_ip = request.remote_addr or ""
+                if retry_after := login_throttle.retry_after(username, client_ip):
+                    return too_many_attempts(retry_after)
+
                 user = verify_user_basic(username, password)  # User | None
 
                 if not user:
+                    login_throttle.record_failure(username, client_ip)
                     return {"message": "Invalid credentials"}, HTTPStatus.UNAUTHORIZED
 
             else:
@@ -113,7 +205,7 @@ def auth_required(allowed_roles: Optional[list[UserRole]] = None):
 
             # Role-based access control
             if allowed_roles:
-                user_role = user.role
+                user_role = g.current_user["role"]
                 if user_role not in [role for role in allowed_roles]:
                     return {
                         "message": "You do not have permission to access this resource"
@@ -0,0 +1,429 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+import heapq
+import logging
+import math
+from operator import itemgetter
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from typing import Iterable, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config.search import (
+    AUTOCOMPLETE_BUILD_BATCH,
+    AUTOCOMPLETE_MIN_SIMILARITY,
+    AUTOCOMPLETE_SCAN_BUDGET,
+    AUTOCOMPLETE_SCAN_WINDOW,
+    AUTOCOMPLETE_MAX_AGE,
+)
+from app.models import db
+from app.models.books import Book
+from app.utils.table_versions import table_versions
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("title", "author")
+_NON_WORD = re.compile(r"[\W_]+")
+_EMPTY = array("I")
+# A bisect per candidate beats intersecting with a posting slice this many
+# times longer than the candidate set
+_PROBE_RATIO = 48
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation: "Tolkien, J.R.R." -> "tolkien j r r"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", stripped.casefold()).strip()
+
+
+def trigrams(words: list[str], prefix: bool = False) -> set[str]:
+    """
+    Trigrams of each word padded as "  word ", like pg_trgm.
+
+    With prefix=True the last word is still being typed, so it gets no
+    trailing pad and "tolk" matches "tolkien".
+    """
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if prefix and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j : j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over distinct title and author strings.
+
+    Every distinct (field, text) is a term with a numeric id; each trigram
+    maps to an array('I') of term ids in ascending order, and a per-term
+    count tracks how many books use it. Terms whose count drops to zero
+    stay in the postings and are skipped until the next rebuild.
+
+    build_index() numbers terms most used first, so the low ids at the head
+    of every posting list are the suggestions most worth finding quickly.
+    """
+
+    def __init__(
+        self,
+        min_similarity: float,
+        scan_window: int = AUTOCOMPLETE_SCAN_WINDOW,
+        scan_budget: int = AUTOCOMPLETE_SCAN_BUDGET,
+    ) -> None:
+        self.min_similarity = min_similarity
+        self.scan_window = scan_window
+        self.scan_budget = scan_budget
+        self._term_ids: tuple[dict[str, int], ...] = tuple({} for _ in FIELDS)
+        self._terms: list[str] = []
+        self._fields = bytearray()
+        self._counts = array("I")
+        self._lengths = array("H")
+        self._postings: dict[str, array] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, field: str, text: Optional[str], count: int = 1) -> None:
+        if not text:
+            return
+        field_index = FIELDS.index(field)
+        with self._lock:
+            term_id = self._term_ids[field_index].get(text)
+            if term_id is None:
+                words = normalize(text).split()
+                if not words:
+                    return
+                text = sys.intern(text)
+                term_id = len(self._terms)
+                self._term_ids[field_index][text] = term_id
+                self._terms.append(text)
+                self._fields.append(field_index)
+                self._counts.append(0)
+                self._lengths.append(min(len(text), 0xFFFF))
+                for gram in trigrams(words):
+                    postings = self._postings.get(gram)
+                    if postings is None:
+                        postings = self._postings[sys.intern(gram)] = array("I")
+                    postings.append(term_id)
+            self._counts[term_id] += count
+
+    def remove(self, field: str, text: Optional[str]) -> None:
+        if not text:
+            return
+        with self._lock:
+            term_id = self._term_ids[FIELDS.index(field)].get(text)
+            if term_id is not None and self._counts[term_id]:
+                self._counts[term_id] -= 1
+
+    def suggest(self, query: str, limit: int) -> list[dict]:
+        """
+        Top `limit` terms for what has been typed: terms holding every query
+        trigram (prefixes share the padded leading ones), or when there are
+        none, terms sharing at least min_similarity of them to absorb typos.
+        Best overlap first, then most books, then shortest.
+
+        Broad queries are ranked among the most used terms only: the scan
+        stops after the first windows of ids that yield enough matches.
+        """
+        normalized = normalize(query)
+        if len(normalized) < 2:
+            return []
+        grams = trigrams(normalized.split(), prefix=True)
+        fuzzy = max(1, math.ceil(len(grams) * self.min_similarity))
+
+        with self._lock:
+            lists = sorted(
+                (self._postings.get(gram, _EMPTY) for gram in grams), key=len
+            )
+            found = self._search(lists, len(lists), limit)
+            if not found and fuzzy < len(lists):
+                found = self._search(lists, fuzzy, limit)
+            terms = self._terms
+            return [
+                {
+                    "value": terms[term_id],
+                    "field": FIELDS[self._fields[term_id]],
+                    "books": count,
+                    "score": round(overlap / len(grams), 3),
+                }
+                for overlap, count, _, term_id in heapq.nlargest(limit, found)
+            ]
+
+    def _search(self, lists: list[array], needed: int, limit: int) -> list[tuple]:
+        cut = len(lists) - needed + 1
+        positions = [0] * len(lists)
+        counts, lengths = self._counts, self._lengths
+        found = []
+        full_matches = scanned = 0
+        while True:
+            # Walk the ids in windows, most used terms first, and stop as soon
+            # as the windows so far leave `limit` good matches to rank
+            bound = min(
+                (
+                    postings[position + self.scan_window]
+                    for postings, position in zip(lists[:cut], positions)
+                    if position + self.scan_window < len(postings)
+                ),
+                default=None,
+            )
+            spans = []
+            for i, postings in enumerate(lists):
+                start = positions[i]
+                end = (
+                    len(postings)
+                    if bound is None
+                    else bisect_left(postings, bound, start)
+                )
+                positions[i] = end
+                scanned += end - start
+                spans.append((postings, start, end))
+            if needed == len(lists):
+                shared = Counter(dict.fromkeys(_intersect(spans), needed))
+            else:
+                shared = _overlaps(spans, cut, needed)
+
+            for overlap, term_id in _best(shared, needed, limit, counts):
+                found.append((overlap, counts[term_id], -lengths[term_id], term_id))
+                full_matches += overlap == len(lists)
+            if bound is None or full_matches >= limit:
+                return found
+            if scanned >= self.scan_budget and len(found) >= limit:
+                return found
+
+
+def _intersect(spans: list[tuple[array, int, int]]) -> set[int]:
+    """Term ids present in every (postings, start, end) span."""
+    postings, start, end = spans[0]
+    matched = set(postings[start:end])
+    for postings, start, end in spans[1:]:
+        if not matched:
+            break
+        if end - start > len(matched) * _PROBE_RATIO:
+            matched = {t for t in matched if _contains(postings, t, start, end)}
+        else:
+            matched.intersection_update(postings[start:end])
+    return matched
+
+
+def _overlaps(spans: list[tuple[array, int, int]], cut: int, needed: int) -> Counter:
+    """
+    How many spans each term id appears in, for ids that can reach `needed`.
+
+    A term holding `needed` of n trigrams appears in at least one of the
+    n - needed + 1 shortest lists, so only the first `cut` spans are scanned
+    and the longer ones are probed for the candidates found.
+    """
+    shared = Counter()
+    for postings, start, end in spans[:cut]:
+        shared.update(postings[start:end])
+    for i, (postings, start, end) in enumerate(spans[cut:], start=cut):
+        if not shared:
+            break
+        if end - start > len(shared) * _PROBE_RATIO:
+            shared.update([t for t in shared if _contains(postings, t, start, end)])
+        else:
+            shared.update(shared.keys() & postings[start:end])
+        # Drop candidates the remaining lists can no longer lift to `needed`
+        floor = needed - (len(spans) - i - 1)
+        if floor > 1:
+            ranked = shared.most_common()
+            shared = Counter(
+                dict(ranked[: bisect_right(ranked, -floor, key=_negated_overlap)])
+            )
+    return shared
+
+
+def _best(
+    shared: Counter, needed: int, limit: int, counts: array
+) -> list[tuple[int, int]]:
+    """
+    Up to `limit` (overlap, term_id) of a window's candidates, best overlap
+    first. Ties at the cut-off go to the lowest ids, the most used terms, so
+    a broad prefix never walks the whole window in Python.
+    """
+    ranked = shared.most_common()
+    floor = max(needed, ranked[limit - 1][1] if len(ranked) >= limit else 0)
+    above = bisect_left(ranked, -floor, key=_negated_overlap)
+    end = bisect_right(ranked, -floor, key=_negated_overlap)
+    best = [
+        (overlap, term_id) for term_id, overlap in ranked[:above] if counts[term_id]
+    ]
+    for term_id in sorted(map(itemgetter(0), ranked[above:end])):
+        if len(best) == limit:
+            break
+        if counts[term_id]:
+            best.append((floor, term_id))
+    return best
+
+
+def _negated_overlap(item: tuple[int, int]) -> int:
+    return -item[1]
+
+
+def _contains(postings: array, term_id: int, start: int, end: int) -> bool:
+    position = bisect_left(postings, term_id, start, end)
+    return position < end and postings[position] == term_id
+
+
+def build_index(rows: Iterable[tuple[str, str]]) -> TrigramIndex:
+    usage = Counter()
+    for title, author in rows:
+        usage[0, title] += 1
+        usage[1, author] += 1
+    index = TrigramIndex(AUTOCOMPLETE_MIN_SIMILARITY)
+    for (field_index, text), count in usage.most_common():
+        index.add(FIELDS[field_index], text, count)
+    return index
+
+
+class Autocomplete:
+    """
+    Per-worker autocomplete index, kept current with the books table.
+
+    Built in a background thread on first use by streaming (title, author)
+    from the database; until it is ready suggestions are empty rather than
+    blocking the request. This worker's commits are applied to it directly.
+    It is rebuilt in the background, while the current one keeps answering,
+    when the books generation shows a write from another worker or when it
+    is older than AUTOCOMPLETE_MAX_AGE, which bounds staleness on the memory
+    generation backend where other workers' writes are invisible.
+    """
+
+    def __init__(self, max_age: int = AUTOCOMPLETE_MAX_AGE) -> None:
+        self.max_age = max_age
+        self._index: Optional[TrigramIndex] = None
+        self._version: Optional[int] = None
+        self._built_at = 0.0
+        # Held by the build thread for the duration of a build
+        self._build_lock = threading.Lock()
+        # A fork (gunicorn --preload) during a build must not leave the child
+        # holding a lock no thread of its own will release
+        os.register_at_fork(after_in_child=self._reset_build_lock)
+
+    def _reset_build_lock(self) -> None:
+        self._build_lock = threading.Lock()
+
+    def suggest(self, query: str, limit: int) -> list[dict]:
+        index = self._index
+        if (
+            index is None
+            or table_versions.get("books") != self._version
+            or time.monotonic() - self._built_at > self.max_age
+        ):
+            self._start_build(current_app._get_current_object())
+        if index is None:
+            return []
+        return index.suggest(query, limit)
+
+    def _start_build(self, app: Flask) -> None:
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            threading.Thread(
+                target=self._build_in_background, args=(app,), daemon=True
+            ).start()
+        except RuntimeError:
+            self._build_lock.release()
+            raise
+
+    def _build_in_background(self, app: Flask) -> None:
+        try:
+            with app.app_context():
+                self._build()
+        except Exception as e:
+            logger.error(f"Autocomplete build failed: {e}")
+        finally:
+            self._build_lock.release()
+
+    def _build(self) -> None:
+        version = table_versions.get("books")
+        rows = db.session.query(Book.title, Book.author).execution_options(
+            yield_per=AUTOCOMPLETE_BUILD_BATCH
+        )
+        self._index = build_index(rows)
+        self._version = version
+        self._built_at = time.monotonic()
+        logger.info(f"Autocomplete index built: {len(self._index)} terms")
+
+    def apply(self, changes: list[tuple[str, str, str]]) -> None:
+        """Apply committed (op, field, text) changes from this worker."""
+        if self._index is None:
+            return
+        for op, field, text in changes:
+            if op == "add":
+                self._index.add(field, text)
+            else:
+                self._index.remove(field, text)
+        # Generations move by one per commit; anything more was another worker
+        version = table_versions.get("books")
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+
+autocomplete = Autocomplete()
+
+
+def _previous(book: Book, field: str) -> str:
+    history = inspect(book).attrs[field].history
+    return history.deleted[0] if history.deleted else getattr(book, field)
+
+
+# Load the old value when these are set, so it can be removed from the index
+for _field in FIELDS:
+    event.listen(getattr(Book, _field), "set", lambda *args: None, active_history=True)
+
+
+@event.listens_for(Session, "before_flush")
+def _load_deleted_terms(session, flush_context, instances) -> None:
+    for book in session.deleted:
+        if isinstance(book, Book):
+            for field in FIELDS:
+                getattr(book, field)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_term_changes(session, flush_context) -> None:
+    if not any(
+        isinstance(obj, Book)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        return
+    # Present (even if empty) whenever the commit will bump the books
+    # generation, so apply() can keep _version in step with it
+    changes = session.info.setdefault("autocomplete_changes", [])
+    for book in session.new:
+        if isinstance(book, Book):
+            changes.extend(("add", field, getattr(book, field)) for field in FIELDS)
+    for book in session.deleted:
+        if isinstance(book, Book):
+            changes.extend(
+                ("remove", field, _previous(book, field)) for field in FIELDS
+            )
+    for book in session.dirty:
+        if isinstance(book, Book) and book not in session.deleted:
+            state = inspect(book)
+            for field in FIELDS:
+                if state.attrs[field].history.has_changes():
+                    changes.append(("remove", field, _previous(book, field)))
+                    changes.append(("add", field, getattr(book, field)))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_term_changes(session) -> None:
+    changes = session.info.pop("autocomplete_changes", None)
+    if changes is not None:
+        autocomplete.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_term_changes(session) -> None:
+    session.info.pop("autocomplete_changes", None)
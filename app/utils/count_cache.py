@@ -0,0 +1,48 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Callable, Hashable
+
+from app.config.pagination import COUNT_CACHE_SIZE, COUNT_CACHE_TTL
+from app.utils.table_versions import table_versions
+
+
+class CountCache:
+    """
+    LRU of (table, filters) -> row count for listing totals.
+
+    An entry is valid until the table's write generation moves on or the
+    TTL expires, so the first page of the catalog costs one COUNT(*) per
+    write instead of one per request.
+    """
+
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[int, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, table: str, filters: Hashable, loader: Callable[[], int]) -> int:
+        key = (table, filters)
+        version = table_versions.get(table)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        count = loader()
+
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, count)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+count_cache = CountCache(COUNT_CACHE_SIZE, COUNT_CACHE_TTL)
@@ -0,0 +1,123 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from typing import BinaryIO
+
+from app.config.uploads import COVER_CHUNK_SIZE, COVERS_FOLDER, MAX_COVER_SIZE
+from app.utils.files import IMAGE_SIGNATURE_LENGTH, guess_image_mime
+
+
+class InvalidCoverError(ValueError):
+    """The uploaded file is not one of the accepted image formats."""
+
+
+class CoverTooLargeError(ValueError):
+    """The uploaded file exceeds MAX_COVER_SIZE."""
+
+
+def cover_relpath(digest: str, mime_type: str) -> str:
+    """
+    Build the content-addressed path of a cover, relative to the store root.
+    """
+    extension = mimetypes.guess_extension(mime_type) or ".bin"
+    return os.path.join(digest[:2], digest[2:4], f"{digest}{extension}")
+
+
+def cover_abspath(relpath: str) -> str:
+    """
+    Resolve a stored cover path to an absolute filesystem path.
+    """
+    return os.path.abspath(os.path.join(COVERS_FOLDER, relpath))
+
+
+def _publish(tmp_path: str, digest: str, size: int, mime_type: str) -> dict:
+    relpath = cover_relpath(digest, mime_type)
+    path = cover_abspath(relpath)
+
+    if os.path.exists(path):
+        # Identical images share one file
+        os.unlink(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Same filesystem as the temp file, so readers never see partial files
+        os.replace(tmp_path, path)
+
+    return {
+        "image_hash": digest,
+        "image_path": relpath,
+        "image_size": size,
+        "image_mime": mime_type,
+    }
+
+
+def _check_size(size: int, max_size: int) -> None:
+    if size > max_size:
+        raise CoverTooLargeError(f"Image exceeds the maximum size of {max_size} bytes.")
+
+
+def _check_type(head: bytes) -> str:
+    mime_type = guess_image_mime(head)
+    if not mime_type:
+        raise InvalidCoverError(
+            "Invalid image content. Allowed types are: png, jpg, jpeg, gif."
+        )
+    return mime_type
+
+
+def check_cover(data: bytes, max_size: int = MAX_COVER_SIZE) -> str:
+    """
+    Apply the upload checks to cover bytes already in memory and return
+    their MIME type.
+    """
+    _check_size(len(data), max_size)
+    return _check_type(data)
+
+
+def save_cover(data: bytes, mime_type: str) -> dict:
+    """
+    Write cover bytes into the store and return the metadata kept on the book.
+    """
+    os.makedirs(COVERS_FOLDER, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=COVERS_FOLDER, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        return _publish(
+            tmp_path, hashlib.sha256(data).hexdigest(), len(data), mime_type
+        )
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def save_cover_stream(stream: BinaryIO, max_size: int = MAX_COVER_SIZE) -> dict:
+    """
+    Copy an uploaded cover into the store chunk by chunk.
+
+    The file is hashed and size-checked while it is copied and its MIME type
+    is sniffed from the first bytes, so memory use does not depend on the
+    upload size.
+    """
+    os.makedirs(COVERS_FOLDER, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=COVERS_FOLDER, suffix=".tmp")
+    try:
+        digest = hashlib.sha256()
+        head = b""
+        size = 0
+        with os.fdopen(fd, "wb") as tmp_file:
+            while chunk := stream.read(COVER_CHUNK_SIZE):
+                size += len(chunk)
+                _check_size(size, max_size)
+                if len(head) < IMAGE_SIGNATURE_LENGTH:
+                    head += chunk[:IMAGE_SIGNATURE_LENGTH]
+                digest.update(chunk)
+                tmp_file.write(chunk)
+
+        mime_type = _check_type(head)
+        return _publish(tmp_path, digest.hexdigest(), size, mime_type)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from typing import Optional
+
+from app.config.auth import CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL
+
+
+class CredentialCache:
+    """
+    Bounded LRU of recently verified (username, password) pairs with a TTL.
+
+    Entries are keyed by an HMAC of the credentials under a per-process key,
+    so plaintext passwords are never kept. An entry only counts as a hit
+    while the user's stored password hash is unchanged.
+    """
+
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._key_secret = secrets.token_bytes(32)
+        # digest -> (expires_at, user_id, password_hash)
+        self._entries: OrderedDict[bytes, tuple[float, int, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, username: str, password: str) -> bytes:
+        message = f"{username}\0{password}".encode("utf-8")
+        return hmac.new(self._key_secret, message, hashlib.sha256).digest()
+
+    def is_verified(
+        self, username: str, password: str, user_id: int, password_hash: str
+    ) -> bool:
+        digest = self._digest(username, password)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if (
+                entry
+                and entry[0] > time.monotonic()
+                and entry[1] == user_id
+                and hmac.compare_digest(entry[2], password_hash)
+            ):
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return True
+            if entry:
+                del self._entries[digest]
+            self.misses += 1
+            return False
+
+    def remember(
+        self, username: str, password: str, user_id: int, password_hash: str
+    ) -> None:
+        digest = self._digest(username, password)
+        with self._lock:
+            self._entries[digest] = (
+                time.monotonic() + self.ttl,
+                user_id,
+                password_hash,
+            )
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for digest in [
+                digest for digest, entry in self._entries.items() if entry[1] == user_id
+            ]:
+                del self._entries[digest]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+
+
+credential_cache = CredentialCache(CREDENTIAL_CACHE_SIZE, CREDENTIAL_CACHE_TTL)
@@ -0,0 +1,77 @@
+from typing import Any, Callable, Optional
+
+# Public field name -> (columns it is rendered from, getter on a model or row).
+# A None getter means the field is the column of the same name.
+FieldSpec = dict[str, tuple[tuple[str, ...], Optional[Callable[[Any], Any]]]]
+
+_serializers: dict[tuple, Callable[[Any], dict]] = {}
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when fields= names something the resource does not expose."""
+
+
+def parse_fields(raw: Optional[str], spec: FieldSpec) -> Optional[list[str]]:
+    """
+    Parse a comma-separated fields= value, keeping the requested order.
+
+    Returns None when no fieldset was asked for, meaning every field.
+    """
+    fields = list(
+        dict.fromkeys(name.strip() for name in (raw or "").split(",") if name.strip())
+    )
+    if not fields:
+        return None
+    unknown = [name for name in fields if name not in spec]
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(spec)}."
+        )
+    return fields
+
+
+def projection(model, spec: FieldSpec, fields: list[str], extra: tuple = ()) -> list:
+    """
+    Columns to SELECT for a fieldset, plus any extra ones (e.g. sort keys).
+    """
+    names = dict.fromkeys(extra)
+    for field in fields:
+        names.update(dict.fromkeys(spec[field][0]))
+    return [getattr(model, name) for name in names]
+
+
+def compile_serializer(
+    spec: FieldSpec, fields: Optional[list[str]] = None
+) -> Callable[[Any], dict]:
+    """
+    Build (once per fieldset) a function rendering a row as a dict.
+
+    The generated body is a single dict literal with direct attribute reads
+    for plain columns, so rendering a row costs one call instead of a loop
+    over per-field getters.
+    """
+    fields = tuple(fields or spec)
+    key = (id(spec), fields)
+    serializer = _serializers.get(key)
+    if serializer is None:
+        namespace: dict[str, Any] = {}
+        items = []
+        for i, name in enumerate(fields):
+            getter = spec[name][1]
+            if getter is None and name.isidentifier():
+                items.append(f"{name!r}: row.{name}")
+            else:
+                namespace[f"_get{i}"] = getter or (
+                    lambda row, name=name: getattr(row, name)
+                )
+                items.append(f"{name!r}: _get{i}(row)")
+        exec(f"def serializer(row):\n    return {{{', '.join(items)}}}\n", namespace)
+        serializer = _serializers[key] = namespace["serializer"]
+    return serializer
+
+
+def serialize(row, spec: FieldSpec, fields: Optional[list[str]] = None) -> dict:
+    """
+    Render a model instance or a projected row as a dict of the given fields.
+    """
+    return compile_serializer(spec, fields)(row)
@@ -1,8 +1,29 @@
+from typing import Optional
+
 from app.config.uploads import ALLOWED_EXTENSIONS
 
+# Leading bytes of the image formats we accept
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+IMAGE_SIGNATURE_LENGTH = max(len(signature) for signature, _ in IMAGE_SIGNATURES)
+
 
 def is_allowed_file(filename: str) -> bool:
     """
     Check if the file has an allowed extension.
     """
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def guess_image_mime(data: bytes) -> Optional[str]:
+    """
+    Detect the image MIME type from the file signature.
+    """
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    return None
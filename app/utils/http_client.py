@@ -0,0 +1,38 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds so a stalled host cannot hang seeding
+DEFAULT_TIMEOUT = (5, 20)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def create_session(pool_size: int = 10, retries: int = 3) -> requests.Session:
+    """
+    Create a pooled session that retries transient failures with backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET", "HEAD"),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def download(
+    session: requests.Session, url: str, timeout: tuple = DEFAULT_TIMEOUT
+) -> requests.Response:
+    """
+    GET a URL through the session and raise for HTTP errors.
+    """
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
@@ -0,0 +1,163 @@
+import base64
+import binascii
+import json
+from typing import Any, NamedTuple, Optional
+
+from flask_sqlalchemy.query import Query
+from sqlalchemy import and_, false, func, inspect, literal, or_
+
+from app.config.pagination import MAX_PER_PAGE
+from app.utils.count_cache import count_cache
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or was issued for another ordering."""
+
+
+# Query arguments that select a page or its shape rather than the rows counted
+PAGING_ARGS = {"page", "per_page", "cursor", "count", "fields", "sort"}
+
+COUNT_MODES = ("exact", "estimated", "none")
+
+
+class KeysetPage(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+
+
+def clamp_per_page(per_page: int) -> int:
+    """Keep per_page within 1..MAX_PER_PAGE."""
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def encode_cursor(names: list[str], values: list[Any]) -> str:
+    payload = json.dumps({"k": names, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, names: list[str]) -> list[Any]:
+    """
+    Return the key values stored in a cursor.
+
+    The cursor must have been issued for the same sort keys, otherwise the
+    seek would skip or repeat rows.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        keys, values = payload["k"], payload["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursorError("Invalid cursor.")
+    if keys != names or not isinstance(values, list) or len(values) != len(names):
+        raise InvalidCursorError("Cursor does not match the requested ordering.")
+    return values
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == literal(value, column.type)
+
+
+def _after(column, value, descending: bool):
+    # MySQL and SQLite sort NULLs first ascending and last descending
+    if value is None:
+        return false() if descending else column.isnot(None)
+    bound = literal(value, column.type)
+    if not descending:
+        return column > bound
+    if column.expression.nullable:
+        return or_(column < bound, column.is_(None))
+    return column < bound
+
+
+def seek_condition(keys: list, values: list[Any]):
+    """
+    Build the "rows after (values)" predicate for a compound ordering.
+
+    keys is a list of (column, descending) pairs; the last one must be
+    unique (the primary key) so the ordering is total. Expands to
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... which every backend can
+    serve from a (k1, k2, ...) index.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        equal = [_equal(keys[j][0], values[j]) for j in range(i)]
+        clauses.append(and_(*equal, _after(column, values[i], descending)))
+    return or_(*clauses)
+
+
+def order_clauses(keys: list) -> list:
+    """ORDER BY clauses for (column, descending) keys."""
+    return [
+        column.desc() if descending else column.asc() for column, descending in keys
+    ]
+
+
+def keyset_query(
+    query: Query, keys: list, after: Optional[list[Any]], per_page: int
+) -> Query:
+    """
+    One keyset page of query, plus a row to tell whether another follows.
+
+    after holds the sort key values of the previous page's last row, or
+    None for the first page.
+    """
+    if after is not None:
+        query = query.filter(seek_condition(keys, after))
+    return query.order_by(None).order_by(*order_clauses(keys)).limit(per_page + 1)
+
+
+def keyset_paginate(
+    query: Query, keys: list, cursor: Optional[str], per_page: int
+) -> KeysetPage:
+    """
+    Page through query by seeking past the last row of the previous page.
+
+    Unlike OFFSET, the cost of a page does not grow with its depth.
+    """
+    # Direction is part of the ordering a cursor was issued for
+    names = [("-" if descending else "") + column.key for column, descending in keys]
+    per_page = clamp_per_page(per_page)
+
+    after = decode_cursor(cursor, names) if cursor else None
+    rows = keyset_query(query, keys, after, per_page).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            names, [getattr(last, column.key) for column, _ in keys]
+        )
+    return KeysetPage(rows, next_cursor)
+
+
+def filter_key(args) -> tuple:
+    """Normalize the filtering query arguments into a hashable cache key."""
+    return tuple(
+        sorted(
+            (name, value)
+            for name, value in args.items(multi=True)
+            if name not in PAGING_ARGS
+        )
+    )
+
+
+def listing_total(query: Query, table: str, args, mode: str) -> Optional[int]:
+    """
+    Total rows matching a listing query for the given count mode.
+
+    exact runs COUNT(*) every time, estimated serves it from the count
+    cache (invalidated by writes to the table), none skips it.
+    """
+    if mode == "none":
+        return None
+    # COUNT of the primary key, not of the entity's columns (cover storage
+    # included); the key keeps the FROM clause that a bare constant would lose
+    entity = query.column_descriptions[0]["entity"]
+    counted = query.order_by(None).with_entities(
+        func.count(inspect(entity).primary_key[0])
+    )
+    count = counted.scalar
+    if mode == "exact":
+        return count()
+    return count_cache.get(table, filter_key(args), count)
@@ -0,0 +1,123 @@
+from datetime import datetime
+import re
+from typing import Callable, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Executable
+
+from app.models.book_facet import BookFacet
+from app.models.books import Book
+from app.models.revoked_token import RevokedToken
+from app.models.user import User
+from app.utils.pagination import keyset_query
+from app.utils.sorting import parse_sort
+
+
+class HotQuery(NamedTuple):
+    name: str
+    table: str
+    statement: Callable[[], Executable]
+
+
+# Lookups on request and seeding paths that must stay index-backed. Each one
+# is built by the same function the application runs, so a change to the
+# real query is what gets explained.
+HOT_QUERIES = [
+    HotQuery(
+        "login by username",
+        "users",
+        lambda: User.by_username("admin").statement,
+    ),
+    HotQuery(
+        "user import email check",
+        "users",
+        lambda: User.values_in_use(
+            User.email, ["a@example.com", "b@example.com"]
+        ).statement,
+    ),
+    HotQuery(
+        "user import username check",
+        "users",
+        lambda: User.values_in_use(User.username, ["alice", "bob"]).statement,
+    ),
+    HotQuery(
+        "book seed isbn check",
+        "books",
+        lambda: Book.isbns_in_use(["9780261103344", "9780441013593"]).statement,
+    ),
+    HotQuery(
+        "catalog sorted by title",
+        "books",
+        lambda: keyset_query(Book.query, parse_sort("title", Book), None, 10).statement,
+    ),
+    HotQuery(
+        "catalog sorted by author, next page",
+        "books",
+        lambda: keyset_query(
+            Book.query, parse_sort("author", Book), ["Herbert", 42], 10
+        ).statement,
+    ),
+    HotQuery(
+        "catalog sorted by availability, descending",
+        "books",
+        lambda: keyset_query(
+            Book.query, parse_sort("-available", Book), None, 10
+        ).statement,
+    ),
+    HotQuery(
+        "top author facets",
+        "book_facets",
+        lambda: BookFacet.top_authors(20).statement,
+    ),
+    HotQuery(
+        "revocation sync",
+        "revoked_tokens",
+        lambda: RevokedToken.unexpired_since(
+            42, {40: 0.0}, datetime(2000, 1, 1)
+        ).statement,
+    ),
+    HotQuery(
+        "expired revoked tokens",
+        "revoked_tokens",
+        lambda: RevokedToken.delete_expired(datetime(2000, 1, 1)),
+    ),
+]
+
+
+def explain(connection: Connection, statement: Executable) -> list[str]:
+    """
+    Return the query plan for a statement, one line per plan row.
+
+    SQLite rows are EXPLAIN QUERY PLAN details ("SEARCH books USING INDEX
+    ..."); MySQL rows are "table:type:key:Extra" from EXPLAIN.
+    """
+    compiled = statement.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+    )
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).mappings()
+        return [row["detail"] for row in rows]
+    rows = connection.execute(text(f"EXPLAIN {compiled}")).mappings()
+    return [
+        f"{row['table']}:{row['type']}:{row['key']}:{row['Extra'] or ''}"
+        for row in rows
+    ]
+
+
+def plan_regressions(dialect: str, plan: list[str], table: str) -> list[str]:
+    """
+    Plan rows that read every row of `table` instead of seeking an index,
+    or that sort in a temporary structure instead of walking one.
+    """
+    if dialect == "sqlite":
+        # "SCAN books" is a table scan; "SCAN books USING INDEX" walks an index
+        scan = re.compile(rf"^SCAN {table}\b(?!.*USING (COVERING )?INDEX)")
+        return [
+            row for row in plan if scan.search(row) or "TEMP B-TREE FOR ORDER BY" in row
+        ]
+    return [
+        row
+        for row in plan
+        if row.startswith(f"{table}:ALL:") or "Using filesort" in row
+    ]
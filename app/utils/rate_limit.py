@@ -0,0 +1,189 @@
+from collections import OrderedDict
+import math
+import sqlite3
+import threading
+import time
+
+from app.config.auth import (
+    LOGIN_IP_BURST,
+    LOGIN_IP_PER_MINUTE,
+    LOGIN_USER_BURST,
+    LOGIN_USER_PER_MINUTE,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_MAX_BUCKETS,
+    RATE_LIMIT_PRUNE_INTERVAL,
+    RATE_LIMIT_SQLITE_PATH,
+)
+
+
+def _refill(
+    tokens: float, updated: float, now: float, capacity: int, rate: float
+) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _take(tokens: float, cost: float, rate: float) -> tuple[float, float]:
+    """Return (remaining tokens, seconds to wait); cost 0 only checks for a token."""
+    needed = max(cost, 1)
+    if tokens >= needed:
+        return tokens - cost, 0.0
+    return tokens, (needed - tokens) / rate
+
+
+class MemoryBackend:
+    """
+    Token buckets in this process only; for tests and single-worker runs.
+
+    Keys are chosen by clients, so at most RATE_LIMIT_MAX_BUCKETS are kept;
+    the least recently used bucket is dropped first.
+    """
+
+    def __init__(self, max_buckets: int = RATE_LIMIT_MAX_BUCKETS) -> None:
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wait(self, key: str, capacity: int, rate: float) -> float:
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0
+        return _take(_refill(*bucket, now, capacity, rate), 0, rate)[1]
+
+    def consume(self, key: str, capacity: int, rate: float) -> None:
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens, _ = _take(_refill(tokens, updated, now, capacity, rate), 1, rate)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+    def prune(self, before: float) -> None:
+        with self._lock:
+            for key in [
+                key for key, (_, updated) in self._buckets.items() if updated < before
+            ]:
+                del self._buckets[key]
+
+
+class SQLiteBackend:
+    """Token buckets in a SQLite file shared by every worker on the host."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_buckets_updated ON buckets (updated)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def wait(self, key: str, capacity: int, rate: float) -> float:
+        # A plain read: checks run on every Basic-auth request and must not
+        # queue behind the write lock
+        row = (
+            self._connection()
+            .execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return 0.0
+        return _take(_refill(*row, time.time(), capacity, rate), 0, rate)[1]
+
+    def consume(self, key: str, capacity: int, rate: float) -> None:
+        connection = self._connection()
+        now = time.time()
+        # IMMEDIATE takes the write lock up front so read-modify-write is atomic
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, _ = _take(_refill(tokens, updated, now, capacity, rate), 1, rate)
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def prune(self, before: float) -> None:
+        self._connection().execute("DELETE FROM buckets WHERE updated < ?", (before,))
+
+
+class LoginThrottle:
+    """
+    Per-(username, IP) and per-IP token buckets for password checks.
+
+    Buckets are checked before any lookup or KDF work and only failed
+    attempts consume tokens, so clients with valid credentials are not
+    slowed down while credential floods are rejected cheaply. Checks only
+    read; a bucket is written when a failure is recorded, and buckets idle
+    long enough to have refilled are pruned every RATE_LIMIT_PRUNE_INTERVAL.
+    """
+
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self.limits = {
+            "user": (LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE / 60),
+            "ip": (LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60),
+        }
+        # A bucket untouched this long is full again, the same as no bucket
+        self._refill_seconds = max(
+            capacity / rate for capacity, rate in self.limits.values()
+        )
+        self._next_prune = 0.0
+
+    def _buckets(self, username: str, client_ip: str) -> list[tuple[str, int, float]]:
+        return [
+            (f"{scope}:{value}", *self.limits[scope])
+            # Keyed by IP as well: anyone can fail a login for any username
+            for scope, value in (
+                ("user", f"{client_ip}:{username}"),
+                ("ip", client_ip),
+            )
+        ]
+
+    def retry_after(self, username: str, client_ip: str) -> int:
+        """Seconds until another attempt is allowed, 0 if allowed now."""
+        return math.ceil(
+            max(
+                self.backend.wait(*bucket)
+                for bucket in self._buckets(username, client_ip)
+            )
+        )
+
+    def record_failure(self, username: str, client_ip: str) -> None:
+        for bucket in self._buckets(username, client_ip):
+            self.backend.consume(*bucket)
+
+        now = time.time()
+        if now >= self._next_prune:
+            self._next_prune = now + RATE_LIMIT_PRUNE_INTERVAL
+            self.backend.prune(now - self._refill_seconds)
+
+
+def create_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "sqlite":
+        return SQLiteBackend(RATE_LIMIT_SQLITE_PATH)
+    if name == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+login_throttle = LoginThrottle(create_backend())
@@ -0,0 +1,77 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import os
+import tempfile
+from typing import Optional
+
+from PIL import Image
+
+from app.config.uploads import RENDITION_SIZES, RENDITION_WORKERS
+from app.utils.cover_store import cover_abspath
+
+# Correct the logging level
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RENDITION_MIME = "image/jpeg"
+
+# Pillow releases the GIL while decoding and resampling, so threads scale here
+rendition_executor = ThreadPoolExecutor(
+    max_workers=RENDITION_WORKERS, thread_name_prefix="cover-renditions"
+)
+
+
+def rendition_relpath(image_hash: str, size: str) -> str:
+    """
+    Path of a rendition relative to the cover store, next to its original.
+    """
+    return os.path.join(image_hash[:2], image_hash[2:4], f"{image_hash}_{size}.jpg")
+
+
+def find_rendition(image_hash: str, size: str) -> Optional[str]:
+    """
+    Return the absolute path of a rendition if it has been generated.
+    """
+    path = cover_abspath(rendition_relpath(image_hash, size))
+    return path if os.path.exists(path) else None
+
+
+def generate_renditions(image_hash: str, image_path: str, force: bool = False) -> int:
+    """
+    Render every configured size of a cover and return how many were written.
+    """
+    written = 0
+    with Image.open(cover_abspath(image_path)) as original:
+        original = original.convert("RGB")
+        for size, bounds in RENDITION_SIZES.items():
+            path = cover_abspath(rendition_relpath(image_hash, size))
+            if not force and os.path.exists(path):
+                continue
+
+            rendition = original.copy()
+            rendition.thumbnail(bounds, Image.Resampling.LANCZOS)
+
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    rendition.save(tmp_file, "JPEG", quality=85, optimize=True)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            written += 1
+    return written
+
+
+def _log_failure(image_hash: str, future: Future) -> None:
+    if error := future.exception():
+        logger.error(f"Failed to render cover {image_hash}: {error}")
+
+
+def schedule_renditions(image_hash: str, image_path: str) -> Future:
+    """
+    Render a cover's sizes in the background worker pool.
+    """
+    future = rendition_executor.submit(generate_renditions, image_hash, image_path)
+    future.add_done_callback(lambda done: _log_failure(image_hash, done))
+    return future
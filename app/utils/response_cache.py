@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from functools import wraps
+import threading
+import time
+from typing import Optional
+
+from flask import Flask, current_app, g, request
+from flask_restx.utils import unpack
+
+from app.config.cache import (
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL,
+)
+from app.schemas import api
+from app.utils.table_versions import table_versions
+
+
+class ResponseCache:
+    """
+    LRU of rendered GET responses, bounded by entry count and body bytes.
+
+    Each entry remembers the write generation of the table it was rendered
+    from; once a commit bumps the generation the entry is never served again.
+    The TTL bounds how stale an entry can get when the bump happened in
+    another worker the generation backend cannot see.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int, ttl: int) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[tuple, float, bytes, int, str]] = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, version: tuple) -> Optional[tuple[bytes, int, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or entry[1] <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            return entry[2:]
+
+    def put(
+        self, key: tuple, version: tuple, body: bytes, status: int, mimetype: str
+    ) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[2])
+            expires = time.monotonic() + self.ttl
+            self._entries[key] = (version, expires, body, status, mimetype)
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[2])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+response_cache = ResponseCache(
+    RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL
+)
+
+# Tables some cached_response view depends on
+_cached_tables: set = set()
+
+
+def _snapshot_versions() -> None:
+    # Read before auth or the view run a query: on REPEATABLE READ the
+    # transaction snapshot is taken at the first query, and a generation read
+    # after it could be newer than the rows the view renders.
+    if request.method == "GET" and _cached_tables:
+        g.table_versions = {
+            table: table_versions.get(table) for table in _cached_tables
+        }
+
+
+def init_response_cache(app: Flask) -> None:
+    app.before_request(_snapshot_versions)
+
+
+def cached_response(*tables: str):
+    """
+    Serve a Resource GET from the response cache until one of `tables` is
+    written.
+
+    Keyed by path, normalized query args and the caller's role. Must sit
+    below auth_required so unauthorized requests never reach the cache.
+    """
+    _cached_tables.update(tables)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            user = getattr(g, "current_user", None)
+            key = (
+                request.path,
+                tuple(sorted(request.args.items(multi=True))),
+                user["role"] if user else None,
+            )
+            snapshot = g.get("table_versions") or {}
+            version = tuple(
+                snapshot[table] if table in snapshot else table_versions.get(table)
+                for table in tables
+            )
+            cached = response_cache.get(key, version)
+            if cached is not None:
+                body, status, mimetype = cached
+                response = current_app.response_class(
+                    body, status=status, mimetype=mimetype
+                )
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            data, code, headers = unpack(func(*args, **kwargs))
+            response = api.make_response(data, code, headers=headers)
+            if response.status_code == 200:
+                response_cache.put(
+                    key,
+                    version,
+                    response.get_data(),
+                    response.status_code,
+                    response.mimetype,
+                )
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,165 @@
+from datetime import datetime
+import hashlib
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.config.auth import (
+    REVOCATION_BLOOM_BITS,
+    REVOCATION_BLOOM_HASHES,
+    REVOCATION_GAP_LIMIT,
+    REVOCATION_GAP_TIMEOUT,
+    REVOCATION_GC_INTERVAL,
+    REVOCATION_SYNC_INTERVAL,
+)
+from app.models import db
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size bit array with k hash positions per key (double hashing).
+
+    A miss proves the key was never added; a hit must be confirmed.
+    """
+
+    def __init__(self, size_bits: int, hash_count: int) -> None:
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList:
+    """
+    Revoked JWT ids shared by all workers through the revoked_tokens table.
+
+    Each worker keeps a bloom filter plus an exact jti -> expiry table and
+    pulls new rows incrementally at most every REVOCATION_SYNC_INTERVAL
+    seconds, so checking a token costs a few hash operations, not a query.
+    """
+
+    def __init__(self) -> None:
+        # Guards the filter; never held across a query
+        self._lock = threading.Lock()
+        # Held by the one thread refreshing from the database
+        self._sync_lock = threading.Lock()
+        self._synced = False
+        self._bloom = BloomFilter(REVOCATION_BLOOM_BITS, REVOCATION_BLOOM_HASHES)
+        self._expiry: dict[str, datetime] = {}
+        self._last_id = 0
+        # Ids below _last_id not seen yet -> when to stop looking for them
+        self._gaps: dict[int, float] = {}
+        self._next_sync = 0.0
+        self._next_gc = time.monotonic() + REVOCATION_GC_INTERVAL
+
+    def _add_local(self, jti: str, expires_at: datetime) -> None:
+        self._bloom.add(jti)
+        self._expiry[jti] = expires_at
+
+    def revoke(self, jti: str, expires_at: datetime) -> None:
+        if not db.session.query(RevokedToken.id).filter_by(jti=jti).first():
+            db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # A concurrent logout with the same token inserted it first
+                db.session.rollback()
+        with self._lock:
+            self._add_local(jti, expires_at)
+
+    def is_revoked(self, jti: str) -> bool:
+        self._maybe_sync()
+        with self._lock:
+            if jti not in self._bloom:
+                return False
+            expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def _maybe_sync(self) -> None:
+        now = time.monotonic()
+        # One thread refreshes; the others keep checking against the current
+        # filter rather than waiting on its query
+        if now < self._next_sync or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + REVOCATION_SYNC_INTERVAL
+            if now >= self._next_gc:
+                self._collect_garbage()
+            self._sync(now)
+        finally:
+            self._sync_lock.release()
+
+    def _sync(self, now: float) -> None:
+        # _last_id, _gaps and _synced are only touched under _sync_lock
+
+        # Auto-increment ids can commit out of order: a lower id may
+        # become visible after a higher one, so ids skipped over are
+        # looked up again until they show up or REVOCATION_GAP_TIMEOUT
+        # passes (rolled back inserts never do)
+        self._gaps = {
+            row_id: until for row_id, until in self._gaps.items() if until > now
+        }
+        rows = RevokedToken.unexpired_since(
+            self._last_id, self._gaps, datetime.utcnow()
+        ).all()
+        with self._lock:
+            for _, jti, expires_at in rows:
+                self._add_local(jti, expires_at)
+        for row_id, _, _ in rows:
+            self._gaps.pop(row_id, None)
+            if row_id > self._last_id:
+                # Gaps found by the first sync are just deleted rows
+                if self._synced:
+                    skipped = range(
+                        max(self._last_id + 1, row_id - REVOCATION_GAP_LIMIT),
+                        row_id,
+                    )
+                    self._gaps.update(
+                        dict.fromkeys(skipped, now + REVOCATION_GAP_TIMEOUT)
+                    )
+                self._last_id = row_id
+        self._synced = True
+
+    def _collect_garbage(self) -> None:
+        # Bloom filters cannot forget, so rebuild from the live entries
+        now = datetime.utcnow()
+        with self._lock:
+            live = {jti: expiry for jti, expiry in self._expiry.items() if expiry > now}
+            self._bloom = BloomFilter(REVOCATION_BLOOM_BITS, REVOCATION_BLOOM_HASHES)
+            self._expiry = {}
+            for jti, expires_at in live.items():
+                self._add_local(jti, expires_at)
+        self._next_gc = time.monotonic() + REVOCATION_GC_INTERVAL
+
+        # On its own connection: the request that triggers GC keeps its
+        # transaction untouched, and a failure only delays the cleanup
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(RevokedToken.delete_expired(now))
+        except SQLAlchemyError as e:
+            logger.warning(f"Revoked token cleanup failed: {e}")
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,58 @@
+import re
+
+import sqlalchemy as sa
+from flask_sqlalchemy.query import Query
+from sqlalchemy.dialects.mysql import match
+
+from app.models import db
+from app.models.books import Book
+
+books_fts = sa.table("books_fts", sa.column("rowid"))
+
+
+def search_terms(q: str) -> list[str]:
+    """
+    Split a search string into words, dropping operators and punctuation.
+    """
+    return re.findall(r"\w+", q)
+
+
+def apply_book_search(query: Query, q: str) -> Query:
+    """
+    Filter a Book query by full-text match on title/author/description.
+
+    Every word must match, as a prefix ("tolk" finds "Tolkien"), and rows
+    are ordered by relevance.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return query
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "mysql":
+        relevance = match(
+            Book.title,
+            Book.author,
+            Book.description,
+            against=" ".join(f"+{term}*" for term in terms),
+        ).in_boolean_mode()
+        return query.filter(relevance).order_by(relevance.desc(), Book.id)
+
+    if dialect == "sqlite":
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        return (
+            query.join(books_fts, books_fts.c.rowid == Book.id)
+            .filter(sa.text("books_fts MATCH :fts_query"))
+            .order_by(sa.text("bm25(books_fts)"), Book.id)
+            .params(fts_query=fts_query)
+        )
+
+    # No full-text index on other backends: substring match on every word
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(
+            Book.title.ilike(pattern)
+            | Book.author.ilike(pattern)
+            | Book.description.ilike(pattern)
+        )
+    return query.order_by(Book.id)
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import logging
+import os
+from typing import Optional
+
+import requests
+
+from app.config.seed import SEED_BUNDLE_DIR, SEED_DOWNLOAD_WORKERS
+from app.utils.cover_store import check_cover
+from app.utils.http_client import create_session, download
+
+# Correct the logging level
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_seed_bundle(bundle_dir: str = SEED_BUNDLE_DIR) -> dict:
+    """
+    Read bundle.json from the seed bundle directory.
+    """
+    with open(os.path.join(bundle_dir, "bundle.json"), encoding="utf-8") as bundle_file:
+        return json.load(bundle_file)
+
+
+def read_seed_cover(
+    book_data: dict, bundle_dir: str = SEED_BUNDLE_DIR
+) -> Optional[bytes]:
+    """
+    Return the bundled cover bytes of a seed book, or None if it is missing.
+    """
+    path = os.path.join(bundle_dir, book_data["cover"])
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as cover_file:
+        return cover_file.read()
+
+
+def fetch_seed_covers(
+    bundle: dict, bundle_dir: str = SEED_BUNDLE_DIR, force: bool = False
+) -> tuple[int, int]:
+    """
+    Download the covers referenced by the bundle into the bundle directory.
+
+    This is the only seeding step that needs the network; run it when the
+    bundle changes and commit the files. Files that fail the upload checks
+    are not written. Returns (downloaded, failed).
+    """
+    pending = [
+        book_data
+        for book_data in bundle["books"]
+        if force or not os.path.exists(os.path.join(bundle_dir, book_data["cover"]))
+    ]
+    if not pending:
+        return 0, 0
+
+    downloaded = failed = 0
+    session = create_session(pool_size=SEED_DOWNLOAD_WORKERS)
+    with ThreadPoolExecutor(max_workers=SEED_DOWNLOAD_WORKERS) as executor:
+        downloads = {
+            executor.submit(download, session, book_data["cover_url"]): book_data
+            for book_data in pending
+        }
+        for future in as_completed(downloads):
+            book_data = downloads[future]
+            try:
+                response = future.result()
+            except requests.RequestException as e:
+                logger.info(f"Failed to download cover for {book_data['title']}: {e}")
+                failed += 1
+                continue
+
+            # Same size and type checks as uploaded covers
+            try:
+                check_cover(response.content)
+            except ValueError as e:
+                logger.info(f"Rejected cover for {book_data['title']}: {e}")
+                failed += 1
+                continue
+
+            path = os.path.join(bundle_dir, book_data["cover"])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as cover_file:
+                cover_file.write(response.content)
+            downloaded += 1
+    session.close()
+    return downloaded, failed
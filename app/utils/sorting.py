@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import Table
+
+
+class InvalidSortError(ValueError):
+    """Raised for unknown sort keys or keys no index can deliver in order."""
+
+
+@lru_cache(maxsize=None)
+def index_sortable_columns(table: Table) -> tuple[str, ...]:
+    """
+    Columns an index can return in order with the primary key as tiebreaker.
+
+    That is the primary key itself plus the leading column of every
+    (column, pk) index, which is what keyset pagination needs to seek.
+    """
+    primary_key = [column.name for column in table.primary_key.columns]
+    leading = set()
+    for index in table.indexes:
+        names = [column.name for column in index.columns]
+        if len(names) == 2 and names[1:] == primary_key:
+            leading.add(names[0])
+    return tuple(primary_key if len(primary_key) == 1 else []) + tuple(sorted(leading))
+
+
+def parse_sort(raw: Optional[str], model) -> Optional[list]:
+    """
+    Turn sort=key / sort=-key into keyset keys [(column, descending), ...].
+
+    Returns None when no sort was asked for. Keys without a supporting
+    index are rejected rather than sorted in a temporary file.
+    """
+    if not raw:
+        return None
+    descending = raw.startswith("-")
+    name = raw[1:] if descending else raw
+    table = model.__table__
+    if name not in table.columns:
+        raise InvalidSortError(f"Unknown sort key: {name}.")
+    sortable = index_sortable_columns(table)
+    if name not in sortable:
+        raise InvalidSortError(
+            f"Cannot sort by {name}: no index supports it. "
+            f"Sortable keys: {', '.join(sortable)}."
+        )
+
+    primary_key = getattr(model, table.primary_key.columns.values()[0].key)
+    column = getattr(model, name)
+    if column is primary_key:
+        return [(primary_key, descending)]
+    # Same direction on the tiebreaker so one index scan serves both keys
+    return [(column, descending), (primary_key, descending)]
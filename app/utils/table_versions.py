@@ -0,0 +1,107 @@
+import sqlite3
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config.cache import CACHE_BACKEND, CACHE_SQLITE_PATH
+
+
+class MemoryVersions:
+    """Generations in this process only; other workers never see the bumps."""
+
+    def __init__(self) -> None:
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def bump(self, tables) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+
+class SQLiteVersions:
+    """Generations in a SQLite file shared by every worker on the host."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS table_versions "
+                "(name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def get(self, table: str) -> int:
+        row = (
+            self._connection()
+            .execute("SELECT version FROM table_versions WHERE name = ?", (table,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def bump(self, tables) -> None:
+        self._connection().executemany(
+            "INSERT INTO table_versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            [(table,) for table in tables],
+        )
+
+
+def create_backend(name: str = CACHE_BACKEND):
+    if name == "sqlite":
+        return SQLiteVersions(CACHE_SQLITE_PATH)
+    if name == "memory":
+        return MemoryVersions()
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+# Per-table write generation, bumped when a commit touches the table.
+# Caches store the generation they were filled at and treat any later one as
+# a miss, so they never need to know which rows changed.
+table_versions = create_backend()
+
+
+def _changed_tables(session: Session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed_tables(session, flush_context) -> None:
+    changed = _changed_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            changed.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_bulk_tables(orm_execute_state) -> None:
+    # insert(User) / update(Book) executed through the session skip the flush
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _changed_tables(state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session) -> None:
+    changed = session.info.pop("changed_tables", None)
+    if changed:
+        table_versions.bump(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tables(session) -> None:
+    session.info.pop("changed_tables", None)
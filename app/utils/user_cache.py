@@ -0,0 +1,53 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Callable, Optional
+
+from app.config.auth import USER_VERSION_CACHE_SIZE, USER_VERSION_CACHE_TTL
+
+
+class UserVersionCache:
+    """
+    Small LRU of user_id -> token_version with a TTL.
+
+    Stateless JWT checks compare the token's version claim against this cache,
+    so the database is read at most once per user per TTL and worker.
+    """
+
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, user_id: int, loader: Callable[[int], Optional[int]]
+    ) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        value = loader(user_id)
+        if value is None:
+            self.invalidate(user_id)
+            return None
+
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_version_cache = UserVersionCache(USER_VERSION_CACHE_SIZE, USER_VERSION_CACHE_TTL)
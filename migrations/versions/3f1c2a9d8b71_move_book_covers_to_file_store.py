@@ -0,0 +1,93 @@
+"""move book covers to file store
+
+Revision ID: 3f1c2a9d8b71
+Revises:
+Create Date: 2026-10-18 09:12:04.118224
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from app.utils.cover_store import cover_abspath, save_cover
+from app.utils.files import guess_image_mime
+
+
+# revision identifiers, used by Alembic.
+revision = "3f1c2a9d8b71"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+books = sa.table(
+    "books",
+    sa.column("id", sa.Integer),
+    sa.column("image", sa.LargeBinary),
+    sa.column("image_hash", sa.String),
+    sa.column("image_path", sa.String),
+    sa.column("image_size", sa.Integer),
+    sa.column("image_mime", sa.String),
+)
+
+
+def upgrade():
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("image_hash", sa.String(length=64), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("image_path", sa.String(length=255), nullable=True)
+        )
+        batch_op.add_column(sa.Column("image_size", sa.Integer(), nullable=True))
+        batch_op.add_column(
+            sa.Column("image_mime", sa.String(length=50), nullable=True)
+        )
+
+    connection = op.get_bind()
+    book_ids = (
+        connection.execute(sa.select(books.c.id).where(books.c.image.isnot(None)))
+        .scalars()
+        .all()
+    )
+
+    # One blob at a time so the migration never holds more than a single cover
+    for book_id in book_ids:
+        image = connection.execute(
+            sa.select(books.c.image).where(books.c.id == book_id)
+        ).scalar()
+        cover = save_cover(image, guess_image_mime(image) or "image/jpeg")
+        connection.execute(books.update().where(books.c.id == book_id).values(**cover))
+
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.drop_column("image")
+
+
+def downgrade():
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "image",
+                sa.LargeBinary().with_variant(mysql.LONGBLOB(), "mysql"),
+                nullable=True,
+            )
+        )
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(books.c.id, books.c.image_path).where(books.c.image_path.isnot(None))
+    ).all()
+    for book_id, image_path in rows:
+        with open(cover_abspath(image_path), "rb") as cover_file:
+            connection.execute(
+                books.update()
+                .where(books.c.id == book_id)
+                .values(image=cover_file.read())
+            )
+
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.drop_column("image_mime")
+        batch_op.drop_column("image_size")
+        batch_op.drop_column("image_path")
+        batch_op.drop_column("image_hash")
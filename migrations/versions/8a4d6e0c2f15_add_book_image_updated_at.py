@@ -0,0 +1,38 @@
+"""add book image_updated_at
+
+Revision ID: 8a4d6e0c2f15
+Revises: 3f1c2a9d8b71
+Create Date: 2026-10-18 10:03:41.502917
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8a4d6e0c2f15"
+down_revision = "3f1c2a9d8b71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("image_updated_at", sa.DateTime(), nullable=True))
+
+    books = sa.table(
+        "books",
+        sa.column("image_path", sa.String),
+        sa.column("image_updated_at", sa.DateTime),
+    )
+    op.execute(
+        books.update()
+        .where(books.c.image_path.isnot(None))
+        .values(image_updated_at=sa.func.current_timestamp())
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.drop_column("image_updated_at")
@@ -0,0 +1,43 @@
+"""add lookup and sort indexes
+
+Revision ID: 9d2f6b4a8e17
+Revises: 5b7e3d9c1a46
+Create Date: 2026-10-18 14:21:07.663480
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "9d2f6b4a8e17"
+down_revision = "5b7e3d9c1a46"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.create_index(batch_op.f("ix_users_email"), ["email"], unique=False)
+
+    # (col, id) serves col lookups as well as keyset pagination sorted by col
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.create_index("ix_books_title_id", ["title", "id"], unique=False)
+        batch_op.create_index("ix_books_author_id", ["author", "id"], unique=False)
+        batch_op.create_index(
+            "ix_books_available_id", ["available", "id"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_books_borrowed_by"), ["borrowed_by"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("books", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_books_borrowed_by"))
+        batch_op.drop_index("ix_books_available_id")
+        batch_op.drop_index("ix_books_author_id")
+        batch_op.drop_index("ix_books_title_id")
+
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_users_email"))
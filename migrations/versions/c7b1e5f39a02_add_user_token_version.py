@@ -0,0 +1,29 @@
+"""add user token_version
+
+Revision ID: c7b1e5f39a02
+Revises: 8a4d6e0c2f15
+Create Date: 2026-10-18 11:26:09.730415
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c7b1e5f39a02"
+down_revision = "8a4d6e0c2f15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("token_version", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("token_version")
@@ -0,0 +1,57 @@
+"""add book_facets
+
+Revision ID: d61a3f8c5b90
+Revises: 9d2f6b4a8e17
+Create Date: 2026-10-18 15:47:26.930215
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d61a3f8c5b90"
+down_revision = "9d2f6b4a8e17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "book_facets",
+        sa.Column("facet", sa.String(length=20), nullable=False),
+        sa.Column("value", sa.String(length=80), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("facet", "value"),
+    )
+    op.create_index(
+        "ix_book_facets_facet_count",
+        "book_facets",
+        ["facet", sa.text("count DESC"), "value"],
+        unique=False,
+    )
+
+    # Backfill from the current catalog; flush hooks keep it current afterwards
+    op.execute(
+        "INSERT INTO book_facets (facet, value, count) "
+        "SELECT 'author', author, COUNT(*) FROM books GROUP BY author"
+    )
+    op.execute(
+        "INSERT INTO book_facets (facet, value, count) "
+        "SELECT 'availability', "
+        "CASE WHEN available THEN 'available' ELSE 'unavailable' END, COUNT(*) "
+        "FROM books GROUP BY CASE WHEN available THEN 'available' ELSE 'unavailable' END"
+    )
+    op.execute(
+        "INSERT INTO book_facets (facet, value, count) "
+        "SELECT 'borrowed', "
+        "CASE WHEN borrowed_by IS NOT NULL THEN 'borrowed' ELSE 'free' END, COUNT(*) "
+        "FROM books "
+        "GROUP BY CASE WHEN borrowed_by IS NOT NULL THEN 'borrowed' ELSE 'free' END"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_book_facets_facet_count", table_name="book_facets")
+    op.drop_table("book_facets")
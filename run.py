@@ -11,3 +11,5 @@ if __name__ == "__main__":
 # flask db init
 # flask db migrate -m "update user"
 # flask db upgrade
+# flask seed  (seed users/books from app/seed/bundle.json, no network)
+# flask users import users.json  (bulk import beyond the API limit)
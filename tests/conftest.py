@@ -0,0 +1,82 @@
+import base64
+from importlib.metadata import version
+import os
+import tempfile
+
+import pytest
+import werkzeug
+
+# Flask 2.2's test client reads werkzeug.__version__, which Werkzeug 3.1 dropped
+if not hasattr(werkzeug, "__version__"):
+    werkzeug.__version__ = version("werkzeug")
+
+# Point the app at a throwaway database and upload folder before it is imported
+_workdir = tempfile.mkdtemp(prefix="booklibrary-tests-")
+os.environ["DATABASE_URI"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["UPLOAD_FOLDER"] = os.path.join(_workdir, "uploads")
+# Cheap hashes keep user setup fast; the policy itself is not under test
+os.environ["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1000"
+
+from app import create_app  # noqa: E402
+from app.models import db  # noqa: E402
+from app.models.books import Book  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+USERS = [
+    {
+        "full_name": "Admin",
+        "username": "admin",
+        "email": "admin@example.com",
+        "role": "admin",
+        "password": "Admin123!",
+    },
+    {
+        "full_name": "Reader",
+        "username": "reader",
+        "email": "reader@example.com",
+        "role": "user",
+        "password": "Reader123!",
+    },
+]
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        User.create_initial_users(USERS)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client(use_cookies=False)
+
+
+@pytest.fixture
+def book(app):
+    """A fresh book, removed again after the test."""
+    with app.app_context():
+        new_book = Book(
+            title="Test Book",
+            author="Test Author",
+            description="A book used by the tests",
+            isbn=os.urandom(6).hex()[:13],
+        )
+        db.session.add(new_book)
+        db.session.commit()
+        book_id = new_book.id
+    yield book_id
+    with app.app_context():
+        stale = db.session.get(Book, book_id)
+        if stale is not None:
+            db.session.delete(stale)
+            db.session.commit()
+
+
+def basic_auth(username: str = "admin", password: str = "Admin123!") -> dict:
+    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
@@ -0,0 +1,38 @@
+from app.models import db
+from app.models.books import Book
+from app.utils.autocomplete import Autocomplete, autocomplete
+from app.utils.table_versions import table_versions
+
+
+def test_suggest_is_empty_until_the_background_build_finishes(app, book):
+    index = Autocomplete()
+    with app.test_request_context():
+        assert index.suggest("Test Book", 5) == []
+        # The build thread holds the lock until the index is in place
+        assert index._build_lock.acquire(timeout=10)
+        index._build_lock.release()
+        suggestions = index.suggest("Test Book", 5)
+
+    assert ("title", "Test Book") in [(s["field"], s["value"]) for s in suggestions]
+
+
+def test_commit_without_term_changes_keeps_the_index_current(app, book):
+    with app.app_context():
+        autocomplete._build()
+        db.session.get(Book, book).available = False
+        db.session.commit()
+
+        assert autocomplete._version == table_versions.get("books")
+
+
+def test_index_older_than_max_age_is_rebuilt(app, book):
+    index = Autocomplete(max_age=0)
+    with app.test_request_context():
+        index._build()
+        built_at = index._built_at
+        # Still answers from the old index while the rebuild runs
+        assert index.suggest("Test Book", 5)
+        assert index._build_lock.acquire(timeout=10)
+        index._build_lock.release()
+
+    assert index._built_at > built_at
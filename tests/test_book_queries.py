@@ -0,0 +1,78 @@
+from sqlalchemy import event
+
+from app.models import db
+from app.models.books import Book
+from tests.conftest import basic_auth
+
+COVER_STORAGE_COLUMNS = ("image_path", "image_size", "image_mime", "image_updated_at")
+
+
+def captured_statements(app, client, path: str, **kwargs) -> list[str]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get(path, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.json
+    return statements
+
+
+def book_selects(statements: list[str]) -> list[str]:
+    return [
+        s
+        for s in statements
+        if s.lstrip().upper().startswith("SELECT") and "books" in s
+    ]
+
+
+def test_book_list_does_not_select_cover_storage(app, client, book):
+    statements = captured_statements(
+        app, client, "/books/", query_string={"count": "exact"}
+    )
+
+    selects = book_selects(statements)
+    assert selects
+    for statement in selects:
+        assert "books.image " not in statement and "books.image," not in statement
+        for column in COVER_STORAGE_COLUMNS:
+            assert f"books.{column}" not in statement
+
+
+def test_book_detail_does_not_select_cover_storage(app, client, book):
+    statements = captured_statements(
+        app, client, f"/books/{book}", headers=basic_auth()
+    )
+
+    selects = book_selects(statements)
+    assert selects
+    for statement in selects:
+        for column in COVER_STORAGE_COLUMNS:
+            assert f"books.{column}" not in statement
+
+
+def test_book_list_total_counts_the_rows(app, client, book):
+    with app.app_context():
+        # A second row, so a total of 1 cannot pass by accident
+        extra = Book(title="Extra", author="Extra", description="", isbn="9" * 13)
+        db.session.add(extra)
+        db.session.commit()
+        extra_id = extra.id
+        expected = db.session.query(Book).count()
+
+    try:
+        response = client.get("/books/", query_string={"count": "exact"})
+    finally:
+        with app.app_context():
+            db.session.delete(db.session.get(Book, extra_id))
+            db.session.commit()
+
+    assert response.status_code == 200
+    assert expected >= 2
+    assert response.json["total"] == expected
@@ -0,0 +1,89 @@
+import io
+
+from PIL import Image
+import pytest
+
+from app.models import db
+from app.models.books import Book
+from app.utils.cover_store import save_cover
+
+
+@pytest.fixture
+def cover(app, book):
+    """(book_id, cover bytes, etag) of a book with a PNG cover."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 30, 30)).save(buffer, format="PNG")
+    data = buffer.getvalue()
+    with app.app_context():
+        stored = save_cover(data, "image/png")
+        db.session.get(Book, book).set_cover(stored)
+        db.session.commit()
+    return book, data, stored["image_hash"]
+
+
+def get_image(client, book_id: int, **headers):
+    return client.get(f"/books/{book_id}/image", headers=headers)
+
+
+def test_full_cover_advertises_ranges(client, cover):
+    book_id, data, _ = cover
+
+    response = get_image(client, book_id)
+
+    assert response.status_code == 200
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.data == data
+
+
+def test_single_range(client, cover):
+    book_id, data, _ = cover
+
+    response = get_image(client, book_id, Range="bytes=0-9")
+
+    assert response.status_code == 206
+    assert response.data == data[:10]
+    assert response.headers["Content-Length"] == "10"
+    assert response.headers["Content-Range"] == f"bytes 0-9/{len(data)}"
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+def test_suffix_range(client, cover):
+    book_id, data, _ = cover
+
+    response = get_image(client, book_id, Range="bytes=-10")
+
+    assert response.status_code == 206
+    assert response.data == data[-10:]
+    assert response.headers["Content-Length"] == "10"
+    assert response.headers["Content-Range"] == (
+        f"bytes {len(data) - 10}-{len(data) - 1}/{len(data)}"
+    )
+
+
+def test_unsatisfiable_range(client, cover):
+    book_id, data, _ = cover
+
+    response = get_image(client, book_id, Range=f"bytes={len(data)}-")
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(data)}"
+
+
+def test_if_range_match_returns_partial(client, cover):
+    book_id, data, etag = cover
+
+    response = get_image(
+        client, book_id, Range="bytes=0-9", **{"If-Range": f'"{etag}"'}
+    )
+
+    assert response.status_code == 206
+    assert response.data == data[:10]
+
+
+def test_if_range_mismatch_returns_full_cover(client, cover):
+    book_id, data, _ = cover
+
+    response = get_image(client, book_id, Range="bytes=0-9", **{"If-Range": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.data == data
@@ -0,0 +1,39 @@
+from app.models import db
+from app.models.books import Book
+
+
+def test_cursor_with_relevance_ranked_search_is_rejected(client, book):
+    response = client.get("/books/", query_string={"q": "test", "cursor": ""})
+
+    assert response.status_code == 400
+    assert response.json["success"] is False
+
+
+def test_cursor_with_sorted_search_pages_in_sort_order(app, client, book):
+    with app.app_context():
+        extra = Book(title="Test Atlas", author="Test", description="", isbn="8" * 13)
+        db.session.add(extra)
+        db.session.commit()
+        extra_id = extra.id
+
+    try:
+        titles, cursor = [], ""
+        while cursor is not None:
+            response = client.get(
+                "/books/",
+                query_string={
+                    "q": "test",
+                    "sort": "title",
+                    "cursor": cursor,
+                    "per_page": 1,
+                },
+            )
+            assert response.status_code == 200, response.json
+            titles += [item["title"] for item in response.json["data"]]
+            cursor = response.json["next_cursor"]
+    finally:
+        with app.app_context():
+            db.session.delete(db.session.get(Book, extra_id))
+            db.session.commit()
+
+    assert titles == ["Test Atlas", "Test Book"]
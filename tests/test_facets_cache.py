@@ -0,0 +1,15 @@
+from tests.conftest import basic_auth
+
+
+def test_rebuild_facets_invalidates_cached_facets(app, client, book):
+    response = client.get("/books/facets", headers=basic_auth())
+    assert response.status_code == 200, response.json
+    response = client.get("/books/facets", headers=basic_auth())
+    assert response.headers["X-Cache"] == "HIT"
+
+    result = app.test_cli_runner().invoke(args=["books", "rebuild-facets"])
+    assert result.exit_code == 0, result.output
+
+    response = client.get("/books/facets", headers=basic_auth())
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
@@ -0,0 +1,94 @@
+import io
+
+from PIL import Image
+import pytest
+
+from app.models import db
+from app.models.books import Book
+from app.models.user import User
+from tests.conftest import basic_auth
+
+
+@pytest.fixture
+def books(app):
+    """Three books, two of them by the same author; removed after the test."""
+    with app.app_context():
+        new_books = [
+            Book(title=title, author=author, description="", isbn=isbn)
+            for title, author, isbn in (
+                ("Dune", "Frank Herbert", "9780441013593"),
+                ("Dune Messiah", "Frank Herbert", "9780593098233"),
+                ("The Hobbit", "J.R.R. Tolkien", "9780261103344"),
+            )
+        ]
+        db.session.add_all(new_books)
+        db.session.commit()
+        ids = [book.id for book in new_books]
+    yield ids
+    with app.app_context():
+        for book_id in ids:
+            stale = db.session.get(Book, book_id)
+            if stale is not None:
+                db.session.delete(stale)
+        db.session.commit()
+
+
+def book_count(app, **filters) -> int:
+    with app.app_context():
+        query = Book.query
+        for column, value in filters.items():
+            query = query.filter(getattr(Book, column).ilike(f"%{value}%"))
+        return query.count()
+
+
+def total(client, path: str, **query) -> int:
+    response = client.get(path, query_string=query, headers=basic_auth())
+    assert response.status_code == 200, response.json
+    return response.json["total"]
+
+
+@pytest.mark.parametrize("mode", ["exact", "estimated"])
+def test_book_totals(app, client, books, mode):
+    assert total(client, "/books/", count=mode) == book_count(app)
+    assert total(client, "/books/", count=mode, author="herbert") == 2
+    assert total(client, "/books/", count=mode, sort="-available") == book_count(app)
+
+
+def test_book_total_none_mode(client, books):
+    assert total(client, "/books/", count="none") is None
+
+
+@pytest.mark.parametrize("mode", ["exact", "estimated"])
+def test_user_totals(app, client, mode):
+    with app.app_context():
+        expected = User.query.count()
+
+    assert expected >= 2
+    assert total(client, "/users/", count=mode) == expected
+    assert total(client, "/users/", count=mode, username="reader") == 1
+
+
+def test_estimated_total_follows_post_and_delete(app, client, books):
+    before = total(client, "/books/", count="estimated")
+    assert before == book_count(app)
+
+    image = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(image, format="PNG")
+    response = client.post(
+        "/books/",
+        data={
+            "title": "Children of Hurin",
+            "author": "J.R.R. Tolkien",
+            "description": "",
+            "isbn": "9780007246229",
+            "image": (io.BytesIO(image.getvalue()), "cover.png"),
+        },
+        headers=basic_auth(),
+    )
+    assert response.status_code == 201, response.json
+    book_id = response.json["data"]["id"]
+    assert total(client, "/books/", count="estimated") == before + 1
+
+    response = client.delete(f"/books/{book_id}", headers=basic_auth())
+    assert response.status_code == 200
+    assert total(client, "/books/", count="estimated") == before
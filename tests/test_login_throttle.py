@@ -0,0 +1,16 @@
+def login(client, password: str, ip: str):
+    return client.post(
+        "/auth/login",
+        json={"username": "reader", "password": password},
+        environ_base={"REMOTE_ADDR": ip},
+    )
+
+
+def test_failures_from_one_ip_do_not_lock_the_user_out_elsewhere(client):
+    for _ in range(7):
+        login(client, "wrong-password", "203.0.113.7")
+    assert login(client, "Reader123!", "203.0.113.7").status_code == 429
+
+    response = login(client, "Reader123!", "198.51.100.23")
+
+    assert response.status_code == 200, response.json
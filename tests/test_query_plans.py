@@ -0,0 +1,14 @@
+import pytest
+
+from app.models import db
+from app.utils.query_plans import HOT_QUERIES, explain, plan_regressions
+
+
+@pytest.mark.parametrize("query", HOT_QUERIES, ids=lambda query: query.name)
+def test_hot_query_uses_an_index(app, query):
+    with app.app_context(), db.engine.connect() as connection:
+        plan = explain(connection, query.statement())
+        problems = plan_regressions(connection.dialect.name, plan, query.table)
+
+    assert plan
+    assert not problems, plan
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import db
+from app.models.revoked_token import RevokedToken
+from app.utils.revocation import revocation_list
+
+
+def test_revoking_a_token_revoked_concurrently_is_not_an_error(app, monkeypatch):
+    jti = "0f4c9a3e-double-logout"
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    with app.app_context():
+        add = db.session.add
+
+        def add_after_other_logout(obj):
+            # The other request inserts between our existence check and commit
+            with db.engine.begin() as connection:
+                connection.execute(
+                    insert(RevokedToken).values(jti=jti, expires_at=expires_at)
+                )
+            add(obj)
+
+        monkeypatch.setattr(db.session, "add", add_after_other_logout)
+        revocation_list.revoke(jti, expires_at)
+        monkeypatch.undo()
+
+        assert revocation_list.is_revoked(jti)
+        assert RevokedToken.query.filter_by(jti=jti).count() == 1
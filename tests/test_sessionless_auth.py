@@ -0,0 +1,43 @@
+import pytest
+
+from tests.conftest import basic_auth
+
+# GET endpoints that refuse anonymous requests, so auth really runs
+AUTHENTICATED_PATHS = ["/users/", "/books/{book}"]
+
+
+@pytest.fixture
+def bearer(client):
+    response = client.post(
+        "/auth/login", json={"username": "reader", "password": "Reader123!"}
+    )
+    assert response.status_code == 200, response.json
+    return {"Authorization": response.json["token"]}
+
+
+@pytest.mark.parametrize("path", AUTHENTICATED_PATHS)
+def test_basic_auth_get_sets_no_cookie(client, book, path):
+    path = path.format(book=book)
+    assert client.get(path).status_code == 401
+    response = client.get(path, headers=basic_auth("reader", "Reader123!"))
+
+    assert response.status_code == 200, response.json
+    assert "Set-Cookie" not in response.headers
+
+
+@pytest.mark.parametrize("path", AUTHENTICATED_PATHS)
+def test_jwt_get_sets_no_cookie(client, book, bearer, path):
+    path = path.format(book=book)
+    assert client.get(path).status_code == 401
+    response = client.get(path, headers=bearer)
+
+    assert response.status_code == 200, response.json
+    assert "Set-Cookie" not in response.headers
+
+
+def test_login_sets_no_cookie(client, bearer):
+    response = client.post(
+        "/auth/login", json={"username": "reader", "password": "Reader123!"}
+    )
+
+    assert "Set-Cookie" not in response.headers
@@ -0,0 +1,38 @@
+from app.models import db
+from app.models.user import User, UserRole
+from tests.conftest import basic_auth
+
+
+def test_admin_demoting_self_with_new_password_can_log_in(app, client, book):
+    with app.app_context():
+        admin = User.create_user(
+            "Temp Admin",
+            "tempadmin",
+            "tempadmin@example.com",
+            "Temp123!",
+            UserRole.ADMIN,
+        )
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+
+    try:
+        response = client.put(
+            "/users/me",
+            json={"role": "user", "password": "Changed123!"},
+            headers=basic_auth("tempadmin", "Temp123!"),
+        )
+        assert response.status_code == 200, response.json
+
+        with app.app_context():
+            user = db.session.get(User, admin_id)
+            assert user.role == UserRole.USER
+            assert User.check_password(user.password, "Changed123!")
+        response = client.get(
+            f"/books/{book}", headers=basic_auth("tempadmin", "Changed123!")
+        )
+        assert response.status_code == 200
+    finally:
+        with app.app_context():
+            db.session.delete(db.session.get(User, admin_id))
+            db.session.commit()